@@ -100,7 +100,7 @@ echo "================================================"
 echo ""
 echo "📂 Output structure:"
 echo "   ${OUTPUT_DIR}/"
-echo "   ├── figures/               # 6 publication figures (PDF + PNG)"
+echo "   ├── figures/               # 6 publication figures (PDF + SVG)"
 echo "   ├── tables/                # LaTeX table1_summary.tex"
 echo "   ├── REPORT.md              # Key findings with numbers"
 echo "   ├── repro.md               # Reproducibility guide"
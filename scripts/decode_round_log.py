@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Decode a binary round log written by fl_server.py --round-log
+
+Prints one JSON line per record, with the same fields as the server's
+round_start / round_end JSON events, so the output can be appended to a
+server log and read by parse_logs.py.
+
+Usage:
+    python scripts/decode_round_log.py rounds.bin >> server.log
+"""
+
+import argparse
+import json
+import math
+import struct
+import sys
+
+# Must match ROUND_RECORD in src/fl_server.py (kept here so decoding does
+# not need torch/flwr installed)
+ROUND_RECORD = struct.Struct("<BIdddddiiB")
+ROUND_START, ROUND_END = 0, 1
+
+
+def decode_records(data: bytes):
+    """Yield one event dict per record in a binary round log"""
+    if len(data) % ROUND_RECORD.size:
+        raise ValueError(
+            f"Truncated round log: {len(data)} bytes is not a multiple of {ROUND_RECORD.size}"
+        )
+
+    for (kind, round_id, timestamp, wall_time, duration, test_loss, test_accuracy,
+         num_success, num_failed, flags) in ROUND_RECORD.iter_unpack(data):
+        if kind == ROUND_START:
+            yield {
+                "event": "round_start",
+                "round_id": round_id,
+                "timestamp": timestamp,
+                "wall_time_since_start": wall_time,
+            }
+        elif kind == ROUND_END:
+            event = {
+                "event": "round_end",
+                "round_id": round_id,
+                "timestamp": timestamp,
+                "round_duration_sec": duration,
+                "num_clients_success": num_success,
+                "num_clients_failed": num_failed,
+            }
+            # NaN marks a round that could not be evaluated; like the
+            # server's JSON round_end, its metrics are left out
+            if not math.isnan(test_loss):
+                event["test_loss"] = test_loss
+                event["test_accuracy"] = test_accuracy
+            event.update(
+                evaluated=bool(flags & 1),
+                eval_cached=bool(flags & 2),
+                wall_time_since_start=wall_time,
+            )
+            yield event
+        else:
+            raise ValueError(f"Unknown record kind {kind} in round log")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Decode a binary FL server round log")
+    parser.add_argument("round_log", help="Binary file written by fl_server.py --round-log")
+    args = parser.parse_args()
+
+    with open(args.round_log, "rb") as f:
+        data = f.read()
+
+    for event in decode_records(data):
+        sys.stdout.write(json.dumps(event) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@
 Export paper assets: figures, tables, report for manuscript
 
 Creates paper/ directory with:
-- figures/ (PDFs + PNGs)
+- figures/ (PDFs + SVGs)
 - tables/ (LaTeX tables)
 - REPORT.md (key findings with numbers)
 - repro.md (reproducibility info)
@@ -369,13 +369,13 @@ def main():
             shutil.copy(fig_file, args.output_dir / "figures" / fig_file.name)
             print(f"  Copied: {fig_file.name}")
         
-        for fig_file in args.figures_dir.glob("*.png"):
+        for fig_file in [*args.figures_dir.glob("*.svg"), *args.figures_dir.glob("*.png")]:
             shutil.copy(fig_file, args.output_dir / "figures" / fig_file.name)
     
     print(f"\n✅ Paper assets exported to: {args.output_dir}")
     print(f"\n📁 Structure:")
     print(f"   {args.output_dir}/")
-    print(f"   ├── figures/      # PDF + PNG figures")
+    print(f"   ├── figures/      # PDF + SVG figures")
     print(f"   ├── tables/       # LaTeX tables")
     print(f"   ├── REPORT.md     # Key findings")
     print(f"   └── repro.md      # Reproducibility guide")
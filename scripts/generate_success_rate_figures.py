@@ -4,6 +4,8 @@ Generate SUCCESS RATE figures (not just counts) for paper
 Fixes the confusing "count" vs "rate" issue
 """
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # Headless: PDF/PNG output only, no GUI backend
 import matplotlib.pyplot as plt
 import numpy as np
 from pathlib import Path
@@ -20,6 +22,10 @@ plt.rcParams.update({
     'ytick.labelsize': 8,
     'legend.fontsize': 8,
     'figure.titlesize': 10,
+    'axes.labelweight': 'bold',
+    'axes.titleweight': 'bold',
+    'path.simplify': True,
+    'path.simplify_threshold': 1.0,
 })
 
 def wilson_ci(success, total, alpha=0.05):
@@ -33,6 +39,12 @@ def wilson_ci(success, total, alpha=0.05):
     adjustment = z * np.sqrt((p*(1-p) + z**2/(4*total))/total) / denominator
     return p, centre - adjustment, centre + adjustment
 
+def _style_axes(ax, xlabel, xticks, xticklabels, title):
+    """Apply the shared success-rate axis styling in one property update"""
+    ax.set(xlabel=xlabel, ylabel='Success Rate (%)', xticks=xticks,
+           xticklabels=xticklabels, ylim=(0, 105), title=title)
+    ax.grid(axis='y', alpha=0.3, linestyle='--')
+
 def create_success_rate_comparison(output_dir: Path):
     """
     Create a single figure with 3 subplots showing success rates
@@ -71,17 +83,12 @@ def create_success_rate_comparison(output_dir: Path):
                 ecolor='black', capsize=3, linewidth=1.2)
     
     # Add count labels on bars
-    for i, (idx, row) in enumerate(net_df.iterrows()):
-        ax.text(i, row['rate'] + 5, f"{row['success']}/{row['total']}", 
+    for i, (s, t, r) in enumerate(zip(net_df['success'].to_numpy(), net_df['total'].to_numpy(),
+                                      net_df['rate'].to_numpy())):
+        ax.text(i, r + 5, f"{s}/{t}",
                ha='center', va='bottom', fontsize=7, fontweight='bold')
     
-    ax.set_ylabel('Success Rate (%)', fontweight='bold')
-    ax.set_xlabel('Network Profile', fontweight='bold')
-    ax.set_xticks(x_pos)
-    ax.set_xticklabels(net_df['profile'])
-    ax.set_ylim(0, 105)
-    ax.grid(axis='y', alpha=0.3, linestyle='--')
-    ax.set_title('(a) By Network', fontweight='bold')
+    _style_axes(ax, 'Network Profile', x_pos, net_df['profile'], '(a) By Network')
     
     # ===== Subplot 2: By Security Configuration =====
     ax = axes[1]
@@ -108,17 +115,12 @@ def create_success_rate_comparison(output_dir: Path):
                 ecolor='black', capsize=3, linewidth=1.2)
     
     # Add count labels
-    for i, (idx, row) in enumerate(sec_df.iterrows()):
-        ax.text(i, row['rate'] + 5, f"{row['success']}/{row['total']}",
+    for i, (s, t, r) in enumerate(zip(sec_df['success'].to_numpy(), sec_df['total'].to_numpy(),
+                                      sec_df['rate'].to_numpy())):
+        ax.text(i, r + 5, f"{s}/{t}",
                ha='center', va='bottom', fontsize=7, fontweight='bold')
     
-    ax.set_ylabel('Success Rate (%)', fontweight='bold')
-    ax.set_xlabel('Security Configuration', fontweight='bold')
-    ax.set_xticks(x_pos)
-    ax.set_xticklabels(sec_df['security'])
-    ax.set_ylim(0, 105)
-    ax.grid(axis='y', alpha=0.3, linestyle='--')
-    ax.set_title('(b) By Security', fontweight='bold')
+    _style_axes(ax, 'Security Configuration', x_pos, sec_df['security'], '(b) By Security')
     
     # ===== Subplot 3: By Data Distribution =====
     ax = axes[2]
@@ -144,17 +146,12 @@ def create_success_rate_comparison(output_dir: Path):
                 ecolor='black', capsize=3, linewidth=1.2)
     
     # Add count labels
-    for i, (idx, row) in enumerate(dist_df.iterrows()):
-        ax.text(i, row['rate'] + 5, f"{row['success']}/{row['total']}",
+    for i, (s, t, r) in enumerate(zip(dist_df['success'].to_numpy(), dist_df['total'].to_numpy(),
+                                      dist_df['rate'].to_numpy())):
+        ax.text(i, r + 5, f"{s}/{t}",
                ha='center', va='bottom', fontsize=7, fontweight='bold')
     
-    ax.set_ylabel('Success Rate (%)', fontweight='bold')
-    ax.set_xlabel('Data Distribution', fontweight='bold')
-    ax.set_xticks(x_pos)
-    ax.set_xticklabels(dist_df['distribution'])
-    ax.set_ylim(0, 105)
-    ax.grid(axis='y', alpha=0.3, linestyle='--')
-    ax.set_title('(c) By Data Distribution', fontweight='bold')
+    _style_axes(ax, 'Data Distribution', x_pos, dist_df['distribution'], '(c) By Data Distribution')
     
     plt.tight_layout()
     
@@ -56,8 +56,16 @@ def parse_server_log(log_file: Path) -> Dict:
                 for r in rounds:
                     if r["round_id"] == round_id and "end_ts" not in r:
                         r["end_ts"] = entry.get("timestamp")
-                        r["accuracy"] = entry.get("test_accuracy", 0)
-                        r["loss"] = entry.get("test_loss", 0)
+                        # Only measured metrics: a skipped round repeats the last
+                        # values and a failed evaluation has none, so both are NaN
+                        # (eval_cached rounds had identical parameters, so the
+                        # reused values are this round's own)
+                        measured = entry.get("evaluated", True) or entry.get("eval_cached", False)
+                        if measured and "test_accuracy" in entry:
+                            r["accuracy"] = entry["test_accuracy"]
+                            r["loss"] = entry.get("test_loss", float("nan"))
+                        else:
+                            r["accuracy"] = r["loss"] = float("nan")
                         r["failures"] = entry.get("num_failures", 0)
                         break
             
@@ -192,16 +200,78 @@ def parse_run(run_dir: Path) -> Dict:
     return result
 
 
+def _run_mtime(run_dir: Path) -> float:
+    """Latest modification time of any file in a run directory"""
+    mtimes = [p.stat().st_mtime for p in run_dir.iterdir()]
+    return max(mtimes, default=run_dir.stat().st_mtime)
+
+
+def _json_default(obj):
+    """Serialize numpy scalars left in summary dicts"""
+    if hasattr(obj, "item"):
+        return obj.item()
+    return str(obj)
+
+
+def parse_run_cached(run_dir: Path, cache_dir: Optional[Path]) -> Dict:
+    """
+    Parse a run directory, reusing a cached result when no file in the run
+    has changed since the last parse (keyed on the newest file mtime)
+    """
+    if cache_dir is None:
+        return parse_run(run_dir)
+    
+    cache_file = cache_dir / f"{run_dir.name}.json"
+    key = _run_mtime(run_dir)
+    
+    if cache_file.exists():
+        try:
+            with open(cache_file) as f:
+                cached = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            cached = None
+        
+        if cached and cached.get("mtime") == key:
+            return {
+                "meta": cached["meta"],
+                "rounds_df": pd.DataFrame(cached["rounds"]) if cached["rounds"] else None,
+                "clients_df": pd.DataFrame(cached["clients"]) if cached["clients"] else None,
+                "summary": cached["summary"],
+                "cached": True
+            }
+    
+    result = parse_run(run_dir)
+    
+    cached = {
+        "mtime": key,
+        "meta": result["meta"],
+        "rounds": result["rounds_df"].to_dict(orient="list") if result["rounds_df"] is not None else None,
+        "clients": result["clients_df"].to_dict(orient="list") if result["clients_df"] is not None else None,
+        "summary": result["summary"]
+    }
+    with open(cache_file, "w") as f:
+        json.dump(cached, f, default=_json_default)
+    
+    return result
+
+
 def main():
     parser = argparse.ArgumentParser(description="Parse FL logs to CSV")
     parser.add_argument("--log-dir", type=Path, required=True, help="Directory containing run logs")
     parser.add_argument("--output-dir", type=Path, required=True, help="Output directory for CSVs")
     parser.add_argument("--run-id", type=str, help="Specific run ID to parse (default: all)")
+    parser.add_argument("--no-cache", action="store_true",
+                       help="Reparse every run instead of reusing <output-dir>/.parse_cache")
     
     args = parser.parse_args()
     
     args.output_dir.mkdir(parents=True, exist_ok=True)
     
+    cache_dir = None
+    if not args.no_cache:
+        cache_dir = args.output_dir / ".parse_cache"
+        cache_dir.mkdir(exist_ok=True)
+    
     # Find all run directories
     if args.run_id:
         run_dirs = [args.log_dir / args.run_id]
@@ -220,8 +290,8 @@ def main():
     all_summaries = []
     
     for run_dir in sorted(run_dirs):
-        print(f"Parsing {run_dir.name}...")
-        result = parse_run(run_dir)
+        result = parse_run_cached(run_dir, cache_dir)
+        print(f"{'Loaded cached' if result.get('cached') else 'Parsed'} {run_dir.name}")
         
         if result["rounds_df"] is not None:
             all_rounds.append(result["rounds_df"])
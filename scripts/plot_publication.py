@@ -11,37 +11,63 @@ Figures:
 6. Bar chart: Failure rate per config
 """
 
+from __future__ import annotations
+
 import argparse
+import hashlib
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
-from matplotlib.patches import FancyBboxPatch, FancyArrowPatch
-import seaborn as sns
-from scipy import stats
-
-# Publication style settings
-plt.rcParams.update({
-    'font.family': 'serif',
-    'font.serif': ['Times New Roman'],
-    'font.size': 10,
-    'axes.labelsize': 11,
-    'axes.titlesize': 12,
-    'xtick.labelsize': 9,
-    'ytick.labelsize': 9,
-    'legend.fontsize': 9,
-    'figure.titlesize': 12,
-    'figure.dpi': 300,
-    'savefig.dpi': 300,
-    'savefig.bbox': 'tight',
-    'savefig.pad_inches': 0.1,
-    'axes.linewidth': 0.8,
-    'grid.linewidth': 0.5,
-    'lines.linewidth': 1.5,
-    'patch.linewidth': 0.8,
-})
+
+# The plotting stack is imported lazily by _load_plotting_stack() so that
+# --help, bad paths and `import plot_publication` stay fast
+pd = np = plt = sns = stats = None
+FancyBboxPatch = FancyArrowPatch = PatchCollection = None
+
+
+def _configure_style():
+    """Publication style settings"""
+    plt.rcParams.update({
+        'font.family': 'serif',
+        'font.serif': ['Times New Roman', 'DejaVu Serif'],
+        'font.size': 10,
+        'axes.labelsize': 11,
+        'axes.titlesize': 12,
+        'xtick.labelsize': 9,
+        'ytick.labelsize': 9,
+        'legend.fontsize': 9,
+        'figure.titlesize': 12,
+        'figure.dpi': 300,
+        'savefig.dpi': 300,
+        'savefig.bbox': 'tight',
+        'savefig.pad_inches': 0.1,
+        'axes.linewidth': 0.8,
+        'grid.linewidth': 0.5,
+        'lines.linewidth': 1.5,
+        'patch.linewidth': 0.8,
+        'figure.constrained_layout.use': True,
+    })
+
+
+def _load_plotting_stack():
+    """Import pandas/matplotlib/seaborn/scipy and apply the figure style"""
+    global pd, np, plt, sns, stats, FancyBboxPatch, FancyArrowPatch, PatchCollection
+    if plt is not None:
+        return
+    
+    import pandas as pd
+    import numpy as np
+    import matplotlib
+    matplotlib.use('Agg')  # Headless: worker processes must not open a display
+    import matplotlib.pyplot as plt
+    from matplotlib.patches import FancyBboxPatch, FancyArrowPatch
+    from matplotlib.collections import PatchCollection
+    import seaborn as sns
+    from scipy import stats
+    
+    _configure_style()
+
 
 # Color palette (colorblind-friendly)
 COLORS = {
@@ -51,6 +77,15 @@ COLORS = {
     'SEC3': '#e41a1c',  # Red
 }
 
+BAR_COLORS = {
+    'NET0': '#377eb8',  # Blue
+    'NET2': '#ff7f00',  # Orange
+}
+
+# Columns the figures actually read
+SUMMARY_COLS = ['sec_level', 'net_profile', 'iid', 'p99_round', 'tta_95', 'failure_rate']
+ROUNDS_COLS = ['run_id', 'round_id', 'duration', 'accuracy']
+
 SEC_LABELS = {
     'SEC0': 'Baseline',
     'SEC1': 'NetworkPolicy',
@@ -66,35 +101,118 @@ def set_figure_size(width_cm=17.8, height_cm=8):
     return (width_inch, height_inch)
 
 
-def save_figure(fig, output_path, formats=['pdf', 'png']):
-    """Save figure in multiple formats"""
+def save_figure(fig, output_path, formats=('pdf', 'svg')):
+    """Save figure in multiple formats (vector only by default; pass 'png' for previews)"""
     output_path = Path(output_path)
     output_path.parent.mkdir(parents=True, exist_ok=True)
     
     for fmt in formats:
         save_path = output_path.with_suffix(f'.{fmt}')
-        fig.savefig(save_path, format=fmt, bbox_inches='tight')
+        if fmt == 'png':
+            # PNG is for previews only: half the pixels and fast zlib
+            fig.savefig(save_path, format=fmt, bbox_inches='tight', dpi=150,
+                        pil_kwargs={'compress_level': 1, 'optimize': False})
+        else:
+            fig.savefig(save_path, format=fmt, bbox_inches='tight')
         print(f"✅ Saved: {save_path}")
 
 
+def load_cached_frame(csv_path: Path, cache_dir: Path | None, loader) -> pd.DataFrame:
+    """
+    Load a figure-ready frame, reusing a pickled copy made from this exact
+    CSV (pickle keeps the categorical/float32 dtypes as loaded)
+    
+    The cache is keyed on the resolved CSV path and stores the CSV's size
+    and mtime, so another results tree's CSV or an edited one is re-parsed.
+    """
+    if cache_dir is None:
+        return loader(csv_path)
+    
+    resolved = str(csv_path.resolve())
+    stat = csv_path.stat()
+    fingerprint = (resolved, stat.st_size, stat.st_mtime_ns)
+    path_key = hashlib.sha1(resolved.encode()).hexdigest()[:12]
+    cache_file = cache_dir / f"{csv_path.stem}-{path_key}.pkl"
+    if cache_file.exists():
+        try:
+            cached_fingerprint, df = pd.read_pickle(cache_file)
+            if cached_fingerprint == fingerprint:
+                return df
+        except Exception:
+            pass  # Unreadable or old-format cache: fall through and re-parse
+    
+    df = loader(csv_path)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    pd.to_pickle((fingerprint, df), cache_file)
+    return df
+
+
+def read_summary_csv(csv_path: Path) -> pd.DataFrame:
+    """Read summary.csv with only the plotted columns"""
+    # Categoricals make every later == an int compare; float32 is plenty of
+    # precision for plotting and halves the bytes every groupby pass moves
+    return pd.read_csv(csv_path, usecols=SUMMARY_COLS,
+                       dtype={'sec_level': 'category', 'net_profile': 'category', 'iid': bool,
+                              'p99_round': 'float32', 'tta_95': 'float32',
+                              'failure_rate': 'float32'})
+
+
+def read_rounds_csv(csv_path: Path) -> pd.DataFrame:
+    """Read rounds.csv with only the plotted columns plus parsed SEC/NET"""
+    rounds_df = pd.read_csv(csv_path, usecols=ROUNDS_COLS,
+                            dtype={'duration': 'float32', 'accuracy': 'float32'})
+    return add_config_columns(rounds_df)
+
+
+def add_config_columns(rounds_df: pd.DataFrame) -> pd.DataFrame:
+    """Parse SEC/NET tokens out of run_id once, as categorical columns"""
+    for col, pattern in (('sec', r'(SEC\d)'), ('net', r'(NET\d)')):
+        rounds_df[col] = rounds_df['run_id'].str.extract(pattern, expand=False).astype('category')
+    return rounds_df
+
+
+def ecdf_per_group(values: np.ndarray, codes: np.ndarray, n_groups: int):
+    """
+    ECDF of values within each integer group code, from one global sort
+    
+    Returns sorted values, ECDF heights, and per-group [start, end) offsets
+    into those arrays.
+    """
+    order = np.lexsort((values, codes))
+    sorted_values = values[order]
+    counts = np.bincount(codes, minlength=n_groups)
+    ends = np.cumsum(counts)
+    starts = ends - counts
+    ranks = np.arange(len(sorted_values)) - np.repeat(starts, counts) + 1
+    heights = ranks / np.repeat(counts, counts)
+    return sorted_values, heights, starts, ends
+
+
 def fig1_system_overview(output_dir: Path):
     """
     Figure 1: ZeroTrust-FLBench System Overview
     Grid-based layout - ZERO overlaps guaranteed
     """
-    # Clear font settings
-    plt.rcParams.update({
+    # Clear font settings (scoped so they don't leak into other figures)
+    with plt.rc_context({
         'font.family': 'sans-serif',
         'font.sans-serif': ['Arial', 'DejaVu Sans', 'Liberation Sans'],
         'font.size': 8
-    })
-    
+    }):
+        _draw_system_overview(output_dir)
+
+
+def _draw_system_overview(output_dir: Path):
+    """Draw and save the Figure 1 diagram under the current rcParams"""
     # Very large figure with clear grid
     fig, ax = plt.subplots(figsize=set_figure_size(20, 16))  
     ax.set_xlim(0, 16)  
     ax.set_ylim(0, 14)  
     ax.axis('off')
     
+    # Boxes are drawn together as one collection once the layout is done
+    boxes = []
+    
     # === ROW 1: TITLE (y=13) ===
     ax.text(8, 13, 'ZeroTrust-FLBench System Architecture',
             ha='center', fontsize=14, fontweight='bold')
@@ -110,7 +228,7 @@ def fig1_system_overview(output_dir: Path):
                              boxstyle="round,pad=0.05",
                              edgecolor='black', facecolor='#e0f2ff',
                              linewidth=1.2)
-        ax.add_patch(box)
+        boxes.append(box)
         ax.text(x, y, f'Client {i+1}', ha='center', va='center', fontsize=9, fontweight='bold')
     
     # CENTER COLUMN: Kubernetes (x=4-12, y=6-12)
@@ -119,7 +237,7 @@ def fig1_system_overview(output_dir: Path):
                              boxstyle="round,pad=0.1",
                              edgecolor='#4169E1', facecolor='#f8f9ff',
                              linewidth=2.5, linestyle='--')
-    ax.add_patch(k8s_box)
+    boxes.append(k8s_box)
     ax.text(8, 11.5, 'Kubernetes Cluster', ha='center', fontsize=11, 
             fontweight='bold', color='#4169E1')
     
@@ -128,7 +246,7 @@ def fig1_system_overview(output_dir: Path):
                                 boxstyle="round,pad=0.08",
                                 edgecolor='black', facecolor='#ffe0e0',
                                 linewidth=1.8)
-    ax.add_patch(server_box)
+    boxes.append(server_box)
     ax.text(7, 10, 'FL Server', ha='center', va='center', fontsize=9, fontweight='bold')
     ax.text(7, 9.7, '(Aggregator)', ha='center', va='center', fontsize=8)
     
@@ -139,7 +257,7 @@ def fig1_system_overview(output_dir: Path):
                                  boxstyle="round,pad=0.05",
                                  edgecolor='black', facecolor='#e0f7ff',
                                  linewidth=1.2)
-        ax.add_patch(pod_box)
+        boxes.append(pod_box)
         ax.text(x, y+0.1, f'Pod {i+1}', ha='center', va='center', fontsize=8, fontweight='bold')
         ax.text(x, y-0.2, 'Client', ha='center', va='center', fontsize=7)
     
@@ -157,7 +275,7 @@ def fig1_system_overview(output_dir: Path):
                                  boxstyle="round,pad=0.05",
                                  edgecolor=color, facecolor='white',
                                  linewidth=2)
-        ax.add_patch(sec_box)
+        boxes.append(sec_box)
         ax.text(14.5, y+0.05, sec, ha='center', va='center', fontsize=8, 
                color=color, fontweight='bold')
         ax.text(14.5, y-0.15, name, ha='center', va='center', fontsize=7, color=color)
@@ -174,10 +292,13 @@ def fig1_system_overview(output_dir: Path):
                                  boxstyle="round,pad=0.05",
                                  edgecolor='#666', facecolor='#fff8e0',
                                  linewidth=1.5)
-        ax.add_patch(net_box)
+        boxes.append(net_box)
         ax.text(x, 3.5, net, ha='center', va='center', fontsize=9, fontweight='bold')
         ax.text(x, 3.2, f'({lat})', ha='center', va='center', fontsize=8)
     
+    # match_original keeps each box's own colors, line width and style
+    ax.add_collection(PatchCollection(boxes, match_original=True))
+    
     # === ARROWS ===
     # Clients to K8s - ALL 5 clients connect
     for _, client_y in client_positions:  # All 5 clients
@@ -207,18 +328,13 @@ def fig2_heatmap_latency(summary_df: pd.DataFrame, output_dir: Path):
     for idx, (iid_val, ax) in enumerate(zip([True, False], axes)):
         df_filtered = summary_df[summary_df['iid'] == iid_val]
         
-        # Pivot for heatmap
-        pivot = df_filtered.pivot_table(
-            values='p99_round',
-            index='sec_level',
-            columns='net_profile',
-            aggfunc='mean'
-        )
-        
-        # Reorder
+        # Pivot for heatmap (groupby + unstack, reordered onto the full grid)
         sec_order = ['SEC0', 'SEC1', 'SEC2', 'SEC3']
         net_order = ['NET0', 'NET2', 'NET4']
-        pivot = pivot.reindex(index=sec_order, columns=net_order)
+        pivot = (df_filtered.groupby(['sec_level', 'net_profile'], observed=True)['p99_round']
+                 .mean()
+                 .unstack('net_profile')
+                 .reindex(index=sec_order, columns=net_order))
         
         # Plot heatmap
         sns.heatmap(pivot, annot=True, fmt='.1f', cmap='YlOrRd',
@@ -235,7 +351,6 @@ def fig2_heatmap_latency(summary_df: pd.DataFrame, output_dir: Path):
         ax.set_yticklabels([SEC_LABELS.get(s, s) for s in sec_order],
                           rotation=0)
     
-    plt.tight_layout()
     save_figure(fig, output_dir / 'fig2_heatmap_p99_latency')
     plt.close()
 
@@ -245,22 +360,27 @@ def fig3_ecdf_latency(rounds_df: pd.DataFrame, output_dir: Path):
     Figure 3: ECDF of round latency per SEC level (NET0 vs NET2)
     """
     fig, axes = plt.subplots(1, 2, figsize=set_figure_size(17.8, 6.5))
-    
-    for idx, (net, ax) in enumerate(zip(['NET0', 'NET2'], axes)):
-        df_filtered = rounds_df[rounds_df['run_id'].str.contains(net)]
-        
-        for sec_level in ['SEC0', 'SEC1', 'SEC2', 'SEC3']:
-            durations = df_filtered[df_filtered['run_id'].str.contains(sec_level)]['duration'].dropna()
-            
-            if len(durations) > 0:
-                sorted_data = np.sort(durations)
-                ecdf = np.arange(1, len(sorted_data) + 1) / len(sorted_data)
-                
-                ax.plot(sorted_data, ecdf,
-                       label=SEC_LABELS[sec_level],
-                       color=COLORS[sec_level],
-                       linewidth=2)
+    ax_by_net = dict(zip(['NET0', 'NET2'], axes))
+    
+    df = rounds_df.dropna(subset=['duration', 'net', 'sec'])
+    nets = df['net'].cat.categories
+    secs = df['sec'].cat.categories
+    codes = df['net'].cat.codes.to_numpy() * len(secs) + df['sec'].cat.codes.to_numpy()
+    sorted_data, ecdf, starts, ends = ecdf_per_group(
+        df['duration'].to_numpy(), codes, len(nets) * len(secs))
+    
+    for group, (start, end) in enumerate(zip(starts, ends)):
+        net, sec_level = nets[group // len(secs)], secs[group % len(secs)]
+        ax = ax_by_net.get(net)
+        if start == end or ax is None or sec_level not in SEC_LABELS:
+            continue
         
+        ax.plot(sorted_data[start:end], ecdf[start:end],
+               label=SEC_LABELS[sec_level],
+               color=COLORS[sec_level],
+               linewidth=2)
+    
+    for net, ax in ax_by_net.items():
         ax.set_xlabel('Round Duration (seconds)', fontweight='bold')
         ax.set_ylabel('Cumulative Probability', fontweight='bold')
         ax.set_title(f'{net} Network Profile', fontweight='bold')
@@ -269,7 +389,6 @@ def fig3_ecdf_latency(rounds_df: pd.DataFrame, output_dir: Path):
         ax.set_xlim(left=0)
         ax.set_ylim([0, 1])
     
-    plt.tight_layout()
     save_figure(fig, output_dir / 'fig3_ecdf_latency')
     plt.close()
 
@@ -280,56 +399,36 @@ def fig4_tta_comparison(summary_df: pd.DataFrame, output_dir: Path):
     """
     fig, ax = plt.subplots(figsize=set_figure_size(17.8, 7))
     
-    # Prepare data
-    metrics = []
-    for sec in ['SEC0', 'SEC1', 'SEC2', 'SEC3']:
-        for net in ['NET0', 'NET2']:
-            df_filtered = summary_df[
-                (summary_df['sec_level'] == sec) &
-                (summary_df['net_profile'] == net)
-            ]
-            
-            tta_values = df_filtered['tta_95'].dropna()
-            if len(tta_values) > 0:
-                mean_tta = tta_values.mean()
-                ci = stats.t.interval(0.95, len(tta_values)-1,
-                                     loc=mean_tta,
-                                     scale=stats.sem(tta_values))
-                err = mean_tta - ci[0]
-                
-                metrics.append({
-                    'sec': sec,
-                    'net': net,
-                    'mean': mean_tta,
-                    'err': err
-                })
+    sec_order = ['SEC0', 'SEC1', 'SEC2', 'SEC3']
+    net_order = ['NET0', 'NET2']
+    
+    # Mean and 95% CI half-width for every (sec, net) cell in one pass
+    tta = (summary_df.dropna(subset=['tta_95'])
+           .groupby(['sec_level', 'net_profile'], observed=True)['tta_95']
+           .agg(['mean', 'sem', 'count']))
+    tta['err'] = tta['sem'] * stats.t.ppf(0.975, tta['count'] - 1)
+    tta = tta.reindex(pd.MultiIndex.from_product([sec_order, net_order])).fillna(0)
     
-    df_plot = pd.DataFrame(metrics)
+    # sec x net matrices; column j feeds the j-th bar series
+    means = tta['mean'].to_numpy().reshape(len(sec_order), len(net_order))
+    errs = tta['err'].to_numpy().reshape(len(sec_order), len(net_order))
     
     # Plot grouped bar chart
-    x = np.arange(len(['SEC0', 'SEC1', 'SEC2', 'SEC3']))
+    x = np.arange(len(sec_order))
     width = 0.35
     
-    for i, net in enumerate(['NET0', 'NET2']):
-        df_net = df_plot[df_plot['net'] == net]
-        means = [df_net[df_net['sec'] == s]['mean'].values[0] if len(df_net[df_net['sec'] == s]) > 0 else 0
-                for s in ['SEC0', 'SEC1', 'SEC2', 'SEC3']]
-        errs = [df_net[df_net['sec'] == s]['err'].values[0] if len(df_net[df_net['sec'] == s]) > 0 else 0
-               for s in ['SEC0', 'SEC1', 'SEC2', 'SEC3']]
-        
-        ax.bar(x + i*width, means, width, yerr=errs,
-              label=net, capsize=4, alpha=0.8,
-              color='#377eb8' if net == 'NET0' else '#ff7f00')
+    for j, net in enumerate(net_order):
+        ax.bar(x + j*width, means[:, j], width, yerr=errs[:, j],
+              label=net, capsize=4, alpha=0.8, color=BAR_COLORS[net])
     
     ax.set_xlabel('Security Configuration', fontweight='bold')
     ax.set_ylabel('Time to 95% Accuracy (seconds)', fontweight='bold')
     ax.set_title('TTA Comparison (Mean ± 95% CI)', fontweight='bold')
     ax.set_xticks(x + width / 2)
-    ax.set_xticklabels([SEC_LABELS[s] for s in ['SEC0', 'SEC1', 'SEC2', 'SEC3']])
+    ax.set_xticklabels([SEC_LABELS[s] for s in sec_order])
     ax.legend(title='Network', frameon=True)
     ax.grid(True, axis='y', alpha=0.3, linestyle='--')
     
-    plt.tight_layout()
     save_figure(fig, output_dir / 'fig4_tta_comparison')
     plt.close()
 
@@ -343,27 +442,29 @@ def fig5_accuracy_convergence(rounds_df: pd.DataFrame, output_dir: Path):
     
     sec_levels = ['SEC0', 'SEC1', 'SEC2', 'SEC3']
     
+    # Per-round mean/std for every (sec, net) cell, sorted once, with one
+    # column per network so each subplot draws both lines in one call
+    acc = (rounds_df.groupby(['sec', 'net', 'round_id'], observed=True)['accuracy']
+           .agg(['mean', 'std'])
+           .unstack('net')
+           .sort_index())
+    
     for idx, (sec, ax) in enumerate(zip(sec_levels, axes)):
-        for net in ['NET0', 'NET2']:
-            df_filtered = rounds_df[
-                rounds_df['run_id'].str.contains(f'{sec}_{net}')
-            ].sort_values('round_id')
+        if sec in acc.index.get_level_values('sec'):
+            cell = acc.loc[sec]
+            nets = [n for n in BAR_COLORS if n in cell['mean'].columns]
+            colors = [BAR_COLORS[n] for n in nets]
             
-            if len(df_filtered) > 0:
-                # Group by round and compute mean
-                grouped = df_filtered.groupby('round_id')['accuracy'].agg(['mean', 'std'])
-                
-                ax.plot(grouped.index, grouped['mean'],
-                       label=net,
-                       linewidth=2,
-                       color='#377eb8' if net == 'NET0' else '#ff7f00')
-                
-                # Shaded error region
-                ax.fill_between(grouped.index,
-                               grouped['mean'] - grouped['std'],
-                               grouped['mean'] + grouped['std'],
+            ax.set_prop_cycle(color=colors)
+            ax.plot(cell.index, cell['mean'][nets].to_numpy(), label=nets, linewidth=2)
+            
+            # Shaded error region
+            for net, color in zip(nets, colors):
+                ax.fill_between(cell.index,
+                               cell['mean'][net] - cell['std'][net],
+                               cell['mean'][net] + cell['std'][net],
                                alpha=0.2,
-                               color='#377eb8' if net == 'NET0' else '#ff7f00')
+                               color=color)
         
         ax.set_xlabel('Round', fontweight='bold')
         ax.set_ylabel('Test Accuracy', fontweight='bold')
@@ -372,7 +473,6 @@ def fig5_accuracy_convergence(rounds_df: pd.DataFrame, output_dir: Path):
         ax.legend(title='Network', frameon=True)
         ax.set_ylim([0.7, 1.0])
     
-    plt.tight_layout()
     save_figure(fig, output_dir / 'fig5_accuracy_convergence')
     plt.close()
 
@@ -383,17 +483,25 @@ def fig6_failure_rate(summary_df: pd.DataFrame, output_dir: Path):
     """
     fig, ax = plt.subplots(figsize=set_figure_size(17.8, 6.5))
     
+    sec_order = ['SEC0', 'SEC1', 'SEC2', 'SEC3']
+    net_order = ['NET0', 'NET2']
+    
+    # Build each level's mask once and AND them into a reused scratch buffer
+    sec_values = summary_df['sec_level'].to_numpy()
+    net_values = summary_df['net_profile'].to_numpy()
+    failure_rates = summary_df['failure_rate'].to_numpy()
+    sec_masks = {s: sec_values == s for s in sec_order}
+    net_masks = {n: net_values == n for n in net_order}
+    mask = np.empty(len(summary_df), dtype=bool)
+    
     # Prepare data
     failure_data = []
-    for sec in ['SEC0', 'SEC1', 'SEC2', 'SEC3']:
-        for net in ['NET0', 'NET2']:
-            df_filtered = summary_df[
-                (summary_df['sec_level'] == sec) &
-                (summary_df['net_profile'] == net)
-            ]
+    for sec in sec_order:
+        for net in net_order:
+            np.logical_and(sec_masks[sec], net_masks[net], out=mask)
             
-            if len(df_filtered) > 0:
-                mean_failure = df_filtered['failure_rate'].mean()
+            if mask.any():
+                mean_failure = failure_rates[mask].mean()
                 failure_data.append({
                     'config': f'{SEC_LABELS[sec]}\n{net}',
                     'failure_rate': mean_failure * 100  # Convert to percentage
@@ -419,13 +527,8 @@ def fig6_failure_rate(summary_df: pd.DataFrame, output_dir: Path):
     ax.set_ylim([0, max(df_plot['failure_rate']) * 1.2])
     
     # Add value labels on bars
-    for bar in bars:
-        height = bar.get_height()
-        ax.text(bar.get_x() + bar.get_width()/2., height,
-               f'{height:.1f}%',
-               ha='center', va='bottom', fontsize=8)
+    ax.bar_label(bars, labels=[f'{v:.1f}%' for v in df_plot['failure_rate']], fontsize=8)
     
-    plt.tight_layout()
     save_figure(fig, output_dir / 'fig6_failure_rate')
     plt.close()
 
@@ -435,39 +538,53 @@ def main():
     parser.add_argument("--summary-csv", type=Path, required=True)
     parser.add_argument("--rounds-csv", type=Path, required=True)
     parser.add_argument("--output-dir", type=Path, default=Path("results/figures/publication"))
+    parser.add_argument("--workers", type=int, default=min(6, os.cpu_count() or 1),
+                       help="Processes used to render figures in parallel")
+    parser.add_argument("--no-cache", action="store_true",
+                       help="Always re-read the CSVs instead of the cached frames")
     
     args = parser.parse_args()
     
+    for csv_path in (args.summary_csv, args.rounds_csv):
+        if not csv_path.exists():
+            print(f"❌ Error: {csv_path} not found")
+            print("   Run parse_logs.py first to generate summary.csv and rounds.csv")
+            sys.exit(1)
+    
+    _load_plotting_stack()
+    
     args.output_dir.mkdir(parents=True, exist_ok=True)
     
     print("📊 Generating publication figures...")
     
-    # Generate Figure 1 (system overview - no data needed)
-    print("\n🎨 Figure 1: System overview")
-    fig1_system_overview(args.output_dir)
-    
     # Load data
     print("\n📂 Loading data...")
-    summary_df = pd.read_csv(args.summary_csv)
-    rounds_df = pd.read_csv(args.rounds_csv)
+    cache_dir = None if args.no_cache else args.output_dir / ".cache"
+    summary_df = load_cached_frame(args.summary_csv, cache_dir, read_summary_csv)
+    rounds_df = load_cached_frame(args.rounds_csv, cache_dir, read_rounds_csv)
     
     print(f"  Loaded {len(summary_df)} runs, {len(rounds_df)} rounds")
     
-    # Generate figures 2-6
-    print("\n🎨 Figure 2: Heatmap latency")
-    fig2_heatmap_latency(summary_df, args.output_dir)
-    
-    print("\n🎨 Figure 3: ECDF latency")
-    fig3_ecdf_latency(rounds_df, args.output_dir)
-    
-    print("\n🎨 Figure 4: TTA comparison")
-    fig4_tta_comparison(summary_df, args.output_dir)
-    
-    print("\n🎨 Figure 5: Accuracy convergence")
-    fig5_accuracy_convergence(rounds_df, args.output_dir)
-    
-    print("\n🎨 Figure 6: Failure rate")
-    fig6_failure_rate(summary_df, args.output_dir)
+    # Figures share no mutable state, so render them in separate processes
+    figures = {
+        "Figure 1: System overview": (fig1_system_overview,),
+        "Figure 2: Heatmap latency": (fig2_heatmap_latency, summary_df),
+        "Figure 3: ECDF latency": (fig3_ecdf_latency, rounds_df),
+        "Figure 4: TTA comparison": (fig4_tta_comparison, summary_df),
+        "Figure 5: Accuracy convergence": (fig5_accuracy_convergence, rounds_df),
+        "Figure 6: Failure rate": (fig6_failure_rate, summary_df),
+    }
+    
+    # The initializer covers spawn-based platforms, where workers start fresh
+    with ProcessPoolExecutor(max_workers=args.workers,
+                             initializer=_load_plotting_stack) as executor:
+        futures = {
+            executor.submit(fn, *fn_args, args.output_dir): name
+            for name, (fn, *fn_args) in figures.items()
+        }
+        for future in as_completed(futures):
+            future.result()
+            print(f"\n🎨 {futures[future]}")
     
     print("\n✅ All figures generated!")
     print(f"   Output: {args.output_dir}")
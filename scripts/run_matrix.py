@@ -6,10 +6,21 @@ Automatically runs the full experiment matrix with proper cleanup between runs.
 """
 
 import argparse
+import functools
+import hashlib
 import itertools
 import json
+import math
+import multiprocessing
+import os
+import shlex
+import shutil
 import subprocess
+import tempfile
+import threading
 import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
 import sys
@@ -35,193 +46,296 @@ NETWORK_PROFILES = ['NET0', 'NET2', 'NET4']
 SECURITY_CONFIGS = ['SEC0', 'SEC1', 'SEC2', 'SEC3']
 SEEDS = [0, 1, 2, 3, 4]
 
+# Namespace the manifests are written against; parallel workers each get a
+# numbered copy so their runs never share resources
+NAMESPACE = "fl-experiment"
+
+# Namespace owned by this worker process (set by _init_worker)
+_worker_namespace = NAMESPACE
+
+# Node-wide state left by the previous run, so unchanged settings are not re-applied
+_applied = {"net_profile": None}
+
+# Upper bound on a single pod log pulled by collect_logs (10 MiB)
+LOG_LIMIT_BYTES = 10 * 1024 * 1024
+
 
 def generate_run_id(workload, data_dist, num_clients, net_profile, sec_config, seed):
-    """Generate unique run ID"""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    return f"{timestamp}_{workload}_{data_dist}_{num_clients}c_{net_profile}_{sec_config}_seed{seed}"
+    """Generate unique run ID (random suffix: parallel runs can start in the same second)"""
+    return (f"{datetime.now():%Y%m%d_%H%M%S}_{uuid.uuid4().hex[:6]}_"
+            f"{workload}_{data_dist}_{num_clients}c_{net_profile}_{sec_config}_seed{seed}")
+
+
+def _run(cmd, **kwargs):
+    """
+    Run a command that must succeed; print what failed and raise
+    CalledProcessError (output is captured unless the caller overrides it)
+    """
+    kwargs.setdefault("capture_output", True)
+    kwargs.setdefault("text", True)
+    try:
+        return subprocess.run(cmd, check=True, **kwargs)
+    except subprocess.CalledProcessError as e:
+        print(f"❌ Command failed (rc={e.returncode}): {' '.join(map(str, cmd))}")
+        if e.stderr:
+            print(e.stderr)
+        raise
 
 
 def wait_for_cluster_ready():
     """Wait for cluster to be in clean state"""
     print("⏳ Waiting for cluster stabilization...")
-    time.sleep(10)
     
-    # Check node status
-    result = subprocess.run(
-        ["kubectl", "get", "nodes"],
-        capture_output=True,
-        text=True
-    )
-    print(result.stdout)
-    
-    if result.returncode != 0:
+    # Block until every node reports Ready (returns at once if they already do)
+    try:
+        result = _run(["kubectl", "wait", "--for=condition=Ready", "nodes", "--all", "--timeout=60s"])
+    except subprocess.CalledProcessError:
         print("❌ Cluster not ready")
         return False
     
+    print(result.stdout)
     return True
 
 
-def cleanup_namespace():
-    """Clean up experiment namespace"""
-    print("🧹 Cleaning up namespace...")
+def cleanup_namespace(namespace=NAMESPACE):
+    """
+    Clean up experiment namespace
     
-    # Delete namespace (this removes all resources)
-    subprocess.run(
-        ["kubectl", "delete", "namespace", "fl-experiment", "--ignore-not-found=true"],
-        capture_output=True
-    )
+    The namespace is not recreated here: the deployment manifest carries its
+    own Namespace object, so the next apply brings it back.
+    """
+    print(f"🧹 Cleaning up namespace {namespace}...")
     
-    # Wait for deletion
-    time.sleep(20)
-    
-    # Recreate namespace
-    subprocess.run(
-        ["kubectl", "create", "namespace", "fl-experiment"],
+    # Delete namespace (this removes all resources) and block until the
+    # apiserver reports it gone, instead of sleeping a fixed buffer
+    result = subprocess.run(
+        ["kubectl", "delete", "namespace", namespace, "--ignore-not-found=true",
+         "--wait=true", "--timeout=120s"],
         capture_output=True
     )
+    if result.returncode != 0:
+        # Finalizers outlasted the delete timeout; give them one more window
+        subprocess.run(
+            ["kubectl", "wait", "--for=delete", f"namespace/{namespace}", "--timeout=60s"],
+            capture_output=True
+        )
     
     print("✅ Namespace cleaned")
 
 
-def reset_network():
-    """Reset network emulation"""
+def switch_network_profile(profile, timeout=600):
+    """
+    Reset network emulation and apply `profile`
+    
+    Both netem scripts run in one `bash -s` process fed over stdin, so a
+    profile switch costs a single fork+exec from Python.
+    """
     print("🔄 Resetting network...")
-    subprocess.run(
-        ["bash", "scripts/netem_reset.sh"],
-        cwd=Path(__file__).parent.parent
-    )
-
-
-def apply_network_profile(profile):
-    """Apply network emulation profile"""
+    script = "bash scripts/netem_reset.sh\n"
+    
     if profile == "NET0":
         print(f"📡 Network profile: {profile} (no impairment)")
-        return
+    else:
+        print(f"📡 Applying network profile: {profile}")
+        # exec: the apply script's exit status becomes the shell's
+        script += f"exec bash scripts/netem_apply.sh {shlex.quote(profile)}\n"
     
-    print(f"📡 Applying network profile: {profile}")
-    result = subprocess.run(
-        ["bash", "scripts/netem_apply.sh", profile],
+    proc = subprocess.Popen(
+        ["bash", "-s"],
+        stdin=subprocess.PIPE,
         cwd=Path(__file__).parent.parent,
-        capture_output=True,
         text=True
     )
+    try:
+        proc.communicate(script, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.communicate()
+        print(f"❌ Timed out switching to network profile {profile}")
+        return False
     
-    if result.returncode != 0:
-        print(f"❌ Failed to apply network profile: {result.stderr}")
+    # A failed reset was never fatal; only the apply step decides
+    if profile != "NET0" and proc.returncode != 0:
+        print(f"❌ Failed to apply network profile: {profile}")
         return False
     
-    print(result.stdout)
     return True
 
 
-def apply_security_config(sec_config):
-    """Apply security configuration"""
+def namespaced_manifest(manifest_paths, namespace):
+    """
+    Manifests joined into one YAML stream and retargeted from the default
+    namespace to `namespace`
+    """
+    docs = (path.read_text() for path in manifest_paths)
+    return "\n---\n".join(docs).replace(NAMESPACE, namespace)
+
+
+def apply_security_config(sec_config, namespace=NAMESPACE):
+    """Apply security configuration (raises CalledProcessError if kubectl rejects it)"""
     print(f"🔒 Applying security config: {sec_config}")
     
     k8s_path = Path(__file__).parent.parent / "k8s"
     
     if sec_config == "SEC0":
         # Baseline only
-        manifest_path = k8s_path / "00-baseline" / "fl-deployment.yaml"
+        manifest_paths = [k8s_path / "00-baseline" / "fl-deployment.yaml"]
     elif sec_config == "SEC1":
         # Baseline + NetworkPolicy
-        manifest_path = k8s_path / "00-baseline" / "fl-deployment.yaml"
-        policy_path = k8s_path / "10-networkpolicy" / "networkpolicies.yaml"
-        
-        subprocess.run(["kubectl", "apply", "-f", str(manifest_path)])
-        subprocess.run(["kubectl", "apply", "-f", str(policy_path)])
-        return True
+        manifest_paths = [k8s_path / "00-baseline" / "fl-deployment.yaml",
+                          k8s_path / "10-networkpolicy" / "networkpolicies.yaml"]
     elif sec_config == "SEC2":
         # Baseline + mTLS (requires Linkerd installed)
         print("⚠️  SEC2 (mTLS) requires Linkerd to be pre-installed")
         print("    Run: linkerd install | kubectl apply -f -")
-        manifest_path = k8s_path / "00-baseline" / "fl-deployment.yaml"
+        manifest_paths = [k8s_path / "00-baseline" / "fl-deployment.yaml"]
         # TODO: Add Linkerd injection annotation
     elif sec_config == "SEC3":
         # NetworkPolicy + mTLS
         print("⚠️  SEC3 requires Linkerd to be pre-installed")
-        manifest_path = k8s_path / "00-baseline" / "fl-deployment.yaml"
-        policy_path = k8s_path / "10-networkpolicy" / "networkpolicies.yaml"
-        
-        subprocess.run(["kubectl", "apply", "-f", str(manifest_path)])
-        subprocess.run(["kubectl", "apply", "-f", str(policy_path)])
-        return True
-    
-    result = subprocess.run(
-        ["kubectl", "apply", "-f", str(manifest_path)],
-        capture_output=True,
-        text=True
-    )
-    
-    if result.returncode != 0:
-        print(f"❌ Failed to apply manifest: {result.stderr}")
-        return False
+        manifest_paths = [k8s_path / "00-baseline" / "fl-deployment.yaml",
+                          k8s_path / "10-networkpolicy" / "networkpolicies.yaml"]
     
+    # One apply for every manifest of this config (raises on failure)
+    _run(["kubectl", "apply", "-f", "-"], input=namespaced_manifest(manifest_paths, namespace))
     return True
 
 
-def wait_for_pods_ready(namespace="fl-experiment", timeout=300):
-    """Wait for all pods to be ready"""
+def wait_for_pods_ready(namespace=NAMESPACE, timeout=300):
+    """Wait for server and client pods to be Ready"""
     print("⏳ Waiting for pods to be ready...")
     
-    start_time = time.time()
-    while time.time() - start_time < timeout:
+    deadline = time.time() + timeout
+    for label in ("app=fl-server", "app=fl-client"):
+        while True:
+            remaining = int(deadline - time.time())
+            if remaining <= 0:
+                print("❌ Timeout waiting for pods")
+                return False
+            
+            # kubectl wait blocks on the apiserver's watch rather than re-listing
+            result = subprocess.run(
+                ["kubectl", "wait", "--for=condition=Ready", "pod", "-l", label,
+                 "-n", namespace, f"--timeout={remaining}s"],
+                capture_output=True,
+                text=True
+            )
+            if result.returncode == 0:
+                break
+            
+            # It errors out immediately if the pods have not been created yet
+            if "no matching resources" not in result.stderr:
+                print(f"❌ Timeout waiting for pods ({label})")
+                return False
+            time.sleep(1)
+    
+    print("✅ Pods ready")
+    return True
+
+
+def wait_for_training_end(namespace=NAMESPACE, timeout=1800):
+    """
+    Follow the server log and return True on the first experiment_end event
+    
+    One streaming `kubectl logs -f` replaces re-fetching the log tail every
+    30s. If the stream drops early (pod restart, API hiccup) the remaining
+    time falls back to polling.
+    """
+    deadline = time.time() + timeout
+    
+    proc = subprocess.Popen(
+        ["kubectl", "logs", "-f", "-n", namespace, "deployment/fl-server"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True
+    )
+    # Killing the process ends the stdout iteration below on timeout
+    timer = threading.Timer(timeout, proc.kill)
+    timer.start()
+    try:
+        for line in proc.stdout:
+            if "experiment_end" in line:
+                return True
+    finally:
+        timer.cancel()
+        proc.kill()
+        proc.wait()
+    
+    while time.time() < deadline:
         result = subprocess.run(
-            ["kubectl", "get", "pods", "-n", namespace],
+            ["kubectl", "logs", "-n", namespace, "deployment/fl-server", "--tail=50"],
             capture_output=True,
             text=True
         )
         
-        print(result.stdout)
-        
-        # Check if server is running
-        if "fl-server" in result.stdout and "Running" in result.stdout:
-            # Check if clients are running or completed
-            client_lines = [l for l in result.stdout.split('\n') if 'fl-client' in l]
-            if len(client_lines) >= 5:  # At least 5 clients
-                print("✅ Pods ready")
-                return True
+        if "experiment_end" in result.stdout:
+            return True
         
-        time.sleep(10)
+        time.sleep(30)
     
-    print("❌ Timeout waiting for pods")
     return False
 
 
-def collect_logs(run_id, results_dir):
+def drain_pods(namespace=NAMESPACE, timeout=60):
+    """Delete the FL server/client workloads and block until their pods are gone"""
+    subprocess.run(
+        ["kubectl", "delete", "deployment,job", "-n", namespace,
+         "-l", "app in (fl-server,fl-client)",
+         "--cascade=foreground", "--wait=true", f"--timeout={timeout}s"],
+        capture_output=True
+    )
+
+
+def collect_logs(run_id, results_dir, num_clients, namespace=NAMESPACE):
     """Collect logs from FL server and clients"""
     print("📝 Collecting logs...")
     
     run_dir = results_dir / run_id
     run_dir.mkdir(parents=True, exist_ok=True)
     
-    # Server logs
-    result = subprocess.run(
-        ["kubectl", "logs", "-n", "fl-experiment", "deployment/fl-server"],
-        capture_output=True,
-        text=True
-    )
-    
-    with open(run_dir / "server.log", "w") as f:
-        f.write(result.stdout)
-    
-    # Client logs
-    client_logs = []
-    for i in range(5):  # Assume 5 clients
-        result = subprocess.run(
-            ["kubectl", "logs", "-n", "fl-experiment", f"job/fl-client-{i}"],
-            capture_output=True,
+    def fetch(resource, stdout=subprocess.PIPE):
+        return subprocess.run(
+            ["kubectl", "logs", "-n", namespace, resource, f"--limit-bytes={LOG_LIMIT_BYTES}"],
+            stdout=stdout,
+            stderr=subprocess.DEVNULL,
             text=True
-        )
-        client_logs.append(result.stdout)
-    
-    with open(run_dir / "clients.log", "w") as f:
-        f.write("\n".join(client_logs))
+        ).stdout
+    
+    # Server + client logs; each fetch is a separate kubectl process, so
+    # threads overlap their startup and API round-trips
+    clients = [f"job/fl-client-{i}" for i in range(num_clients)]
+    client_parts = [tempfile.TemporaryFile() for _ in clients]
+    try:
+        with open(run_dir / "server.log", "w") as server_log, \
+                ThreadPoolExecutor(max_workers=min(32, len(clients) + 1)) as executor:
+            # kubectl writes every log straight to disk, never through Python;
+            # clients land in scratch files that are stitched in order below
+            executor.submit(fetch, "deployment/fl-server", server_log)
+            list(executor.map(fetch, clients, client_parts))
+        
+        with open(run_dir / "clients.log", "wb") as f:
+            for i, part in enumerate(client_parts):
+                if i:
+                    f.write(b"\n")
+                part.seek(0)
+                shutil.copyfileobj(part, f)
+    finally:
+        for part in client_parts:
+            part.close()
     
     print(f"✅ Logs saved to {run_dir}")
 
 
+@functools.lru_cache(maxsize=1)
+def k8s_version():
+    """kubectl/cluster version string (fixed for the whole matrix, so fetched once)"""
+    return subprocess.run(
+        ["kubectl", "version", "--short"],
+        capture_output=True,
+        text=True
+    ).stdout.strip()
+
+
 def save_metadata(run_id, config, results_dir):
     """Save run metadata"""
     run_dir = results_dir / run_id
@@ -232,11 +346,7 @@ def save_metadata(run_id, config, results_dir):
         "timestamp": datetime.now().isoformat(),
         "config": config,
         "environment": {
-            "k8s_version": subprocess.run(
-                ["kubectl", "version", "--short"],
-                capture_output=True,
-                text=True
-            ).stdout.strip()
+            "k8s_version": k8s_version()
         }
     }
     
@@ -244,8 +354,15 @@ def save_metadata(run_id, config, results_dir):
         json.dump(metadata, f, indent=2)
 
 
-def run_single_experiment(workload, data_dist, num_clients, net_profile, sec_config, seed, results_dir):
-    """Run a single experiment configuration"""
+def run_single_experiment(workload, data_dist, num_clients, net_profile, sec_config, seed, results_dir,
+                          namespace=NAMESPACE, manage_network=True):
+    """
+    Run a single experiment configuration
+    
+    With manage_network=False the caller has already applied net_profile
+    (netem is node-wide, so parallel runs share one profile per batch).
+    Returns the run_id on success, False on failure.
+    """
     
     run_id = generate_run_id(workload, data_dist, num_clients, net_profile, sec_config, seed)
     
@@ -259,32 +376,35 @@ def run_single_experiment(workload, data_dist, num_clients, net_profile, sec_con
         "num_clients": num_clients,
         "network_profile": net_profile,
         "security_config": sec_config,
-        "seed": seed
+        "seed": seed,
+        "namespace": namespace
     }
     
     # Save metadata first
     save_metadata(run_id, config, results_dir)
     
     # Step 1: Cleanup
-    cleanup_namespace()
+    cleanup_namespace(namespace)
     
-    # Step 2: Reset network
-    reset_network()
-    
-    # Step 3: Apply network profile
-    if not apply_network_profile(net_profile):
-        print(f"❌ Failed run: {run_id}")
-        return False
+    if manage_network and _applied["net_profile"] != net_profile:
+        # Step 2-3: Reset network and apply network profile
+        _applied["net_profile"] = None
+        if not switch_network_profile(net_profile):
+            print(f"❌ Failed run: {run_id}")
+            return False
+        _applied["net_profile"] = net_profile
     
     # Step 4: Apply security config
-    if not apply_security_config(sec_config):
+    try:
+        apply_security_config(sec_config, namespace)
+    except subprocess.CalledProcessError:
         print(f"❌ Failed run: {run_id}")
         return False
     
     # Step 5: Wait for pods
-    if not wait_for_pods_ready():
+    if not wait_for_pods_ready(namespace):
         print(f"❌ Failed run: {run_id}")
-        collect_logs(run_id, results_dir)  # Collect logs anyway for debugging
+        collect_logs(run_id, results_dir, num_clients, namespace)  # Collect logs anyway for debugging
         return False
     
     # Step 6: Wait for training to complete
@@ -292,71 +412,184 @@ def run_single_experiment(workload, data_dist, num_clients, net_profile, sec_con
     print("⏳ Waiting for training to complete...")
     
     max_training_time = 1800  # 30 minutes
-    start_time = time.time()
     
-    while time.time() - start_time < max_training_time:
-        result = subprocess.run(
-            ["kubectl", "logs", "-n", "fl-experiment", "deployment/fl-server", "--tail=50"],
-            capture_output=True,
-            text=True
-        )
-        
-        if "experiment_end" in result.stdout:
-            print("✅ Training completed")
-            break
-        
-        time.sleep(30)
+    if wait_for_training_end(namespace, max_training_time):
+        print("✅ Training completed")
     else:
         print("⚠️  Training timeout (may still be running)")
     
     # Step 7: Collect logs
-    collect_logs(run_id, results_dir)
+    collect_logs(run_id, results_dir, num_clients, namespace)
     
-    # Step 8: Cool-down
-    print("⏳ Cool-down period...")
-    time.sleep(60)
+    # Step 8: Drain - tear the workloads down and wait for their pods to go,
+    # rather than idling a fixed cool-down
+    print("⏳ Draining FL pods...")
+    drain_pods(namespace)
     
     print(f"✅ Completed run: {run_id}\n")
+    return run_id
+
+
+def config_key(config):
+    """Stable identity of a config tuple, independent of its matrix position"""
+    return hashlib.sha1(repr(tuple(config)).encode()).hexdigest()
+
+
+def load_completed(manifest_path):
+    """Keys of every config recorded in the completion manifest"""
+    if not manifest_path.exists():
+        return set()
+    with open(manifest_path) as f:
+        return {config_key(json.loads(line)["config"]) for line in f if line.strip()}
+
+
+def record_completed(manifest_path, config, run_id):
+    """Append a finished run to the completion manifest, durably"""
+    with open(manifest_path, "a") as f:
+        f.write(json.dumps({"config": list(config), "run_id": run_id}) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def continue_after_failure(on_failure):
+    """Apply the --on-failure policy; returns False when the matrix should stop"""
+    if on_failure == "abort":
+        print("🛑 Aborting after failure (--on-failure=abort)")
+        return False
+    if on_failure == "prompt":
+        return input("❓ Continue despite failure? [Y/n] ").strip().lower() not in ("n", "no")
+    print("⚠️  Continuing despite failure (auto-continue enabled)")
     return True
 
 
-def generate_experiment_list(tier="core"):
-    """Generate list of experiment configurations"""
+def _init_worker(slot_counter):
+    """Claim a slot, and with it a dedicated namespace, for this worker process"""
+    global _worker_namespace
+    with slot_counter.get_lock():
+        slot_id = slot_counter.value
+        slot_counter.value += 1
+    _worker_namespace = f"{NAMESPACE}-{slot_id}"
+
+
+def run_one_in_slot(config, results_dir):
+    """Run one config in this worker's namespace (network profile already applied)"""
+    return run_single_experiment(*config, results_dir=results_dir,
+                                 namespace=_worker_namespace, manage_network=False)
+
+
+def run_matrix_parallel(configs, results_dir, workers, on_failure="continue", manifest_path=None):
+    """
+    Run configs concurrently, one namespace per worker process
+    
+    Network emulation applies to the whole node, so configs are batched by
+    network profile and each batch runs under a single apply of that profile.
+    On a failure the --on-failure policy decides whether queued runs are
+    cancelled (runs already in flight finish). Successful runs are appended
+    to manifest_path when given. Returns (success_count, fail_count).
+    """
+    success_count = 0
+    fail_count = 0
+    done = 0
+    
+    slot_counter = multiprocessing.Value('i', 0)
+    by_profile = sorted(configs, key=lambda c: c[3])
+    total = len(by_profile)
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(slot_counter,)) as executor:
+        aborted = False
+        for net_profile, group in itertools.groupby(by_profile, key=lambda c: c[3]):
+            if aborted:
+                break
+            group = list(group)
+            
+            if not switch_network_profile(net_profile):
+                print(f"❌ Skipping {len(group)} runs for {net_profile}")
+                fail_count += len(group)
+                done += len(group)
+                continue
+            
+            futures = {executor.submit(run_one_in_slot, config, results_dir): config for config in group}
+            for future in as_completed(futures):
+                if future.cancelled():
+                    continue
+                done += 1
+                run_id = future.result()
+                if run_id:
+                    success_count += 1
+                    if manifest_path is not None:
+                        record_completed(manifest_path, futures[future], run_id)
+                else:
+                    fail_count += 1
+                    if not aborted and not continue_after_failure(on_failure):
+                        aborted = True
+                        for pending in futures:
+                            pending.cancel()
+                print(f"\n📊 Experiment {done}/{total} finished: {futures[future]}")
+    
+    return success_count, fail_count
+
+
+def experiment_dimensions(tier="core"):
+    """Per-dimension value lists for a tier, in itertools.product order"""
     
     if tier == "core":
         # Tier 1: Core set (80 runs)
-        configs = list(itertools.product(
+        dims = (
             ['mnist'],           # workload
             DATA_DISTRIBUTIONS,  # iid, noniid
             [5],                 # num_clients
             ['NET0', 'NET2'],    # networks
             SECURITY_CONFIGS,    # SEC0-SEC3
             SEEDS                # 5 seeds
-        ))
+        )
     elif tier == "extended":
         # Tier 2: Extended set (320 runs total)
-        configs = list(itertools.product(
+        dims = (
             ['mnist'],
             DATA_DISTRIBUTIONS,
             NUM_CLIENTS_LIST,    # 5, 10
             NETWORK_PROFILES,    # NET0, NET2, NET4
             SECURITY_CONFIGS,
             SEEDS
-        ))
+        )
     elif tier == "full":
         # Tier 3: Full set (480 runs)
-        configs = list(itertools.product(
+        dims = (
             ['mnist', 'cifar10'],
             DATA_DISTRIBUTIONS,
             NUM_CLIENTS_LIST,
             NETWORK_PROFILES,
             SECURITY_CONFIGS,
             SEEDS
-        ))
+        )
     else:
         raise ValueError(f"Unknown tier: {tier}")
     
-    return configs
+    return dims
+
+
+def generate_experiment_list(tier="core"):
+    """
+    Lazily generate experiment configurations
+    
+    Tuples keep the (workload, data_dist, num_clients, net_profile,
+    sec_config, seed) layout, but iteration nests the costly-to-switch
+    dimensions outermost so consecutive runs mostly share a network and
+    security setup; data distribution and seed vary fastest.
+    """
+    workloads, data_dists, num_clients, net_profiles, sec_configs, seeds = experiment_dimensions(tier)
+    return (
+        (workload, data_dist, n_clients, net_profile, sec_config, seed)
+        for workload, n_clients, net_profile, sec_config, data_dist, seed in itertools.product(
+            workloads, num_clients, net_profiles, sec_configs, data_dists, seeds
+        )
+    )
+
+
+def count_experiments(tier="core"):
+    """Number of configurations in a tier, without generating them"""
+    return math.prod(len(values) for values in experiment_dimensions(tier))
 
 
 def main():
@@ -382,24 +615,43 @@ def main():
         "--resume-from",
         type=int,
         default=0,
-        help="Resume from experiment number (0-indexed)"
+        help="Resume from experiment number (0-indexed); configs already in "
+             "<results-dir>/_completed.jsonl are skipped regardless"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Experiments to run concurrently, each in its own namespace"
+    )
+    parser.add_argument(
+        "--on-failure",
+        choices=["continue", "prompt", "abort"],
+        default="continue",
+        help="What to do after a failed run (prompt needs an interactive stdin)"
     )
     
     args = parser.parse_args()
     
+    if args.on_failure == "prompt" and not sys.stdin.isatty():
+        # Nobody can answer under nohup/CI/detached tmux; never block the matrix
+        print("⚠️  --on-failure=prompt needs a TTY on stdin; continuing on failures instead")
+        args.on_failure = "continue"
+    
     # Create results directory
     args.results_dir.mkdir(parents=True, exist_ok=True)
     
-    # Generate experiment list
-    configs = generate_experiment_list(args.tier)
+    # Generate experiment list lazily; resuming is a plain islice
+    total = count_experiments(args.tier)
+    configs = itertools.islice(generate_experiment_list(args.tier), args.resume_from, None)
     
     print(f"📊 Experiment tier: {args.tier}")
-    print(f"📊 Total experiments: {len(configs)}")
+    print(f"📊 Total experiments: {total}")
     print(f"📁 Results directory: {args.results_dir}")
     
     if args.dry_run:
         print("\n🔍 Dry run - experiment list:")
-        for i, config in enumerate(configs):
+        for i, config in enumerate(configs, start=args.resume_from):
             print(f"  {i}: {config}")
         sys.exit(0)
     
@@ -408,33 +660,47 @@ def main():
         print("❌ Cluster not ready. Exiting.")
         sys.exit(1)
     
+    # Configs recorded as finished by earlier invocations are skipped by
+    # identity, so a reordered matrix cannot make --resume-from point wrong
+    manifest_path = args.results_dir / "_completed.jsonl"
+    completed = load_completed(manifest_path)
+    if completed:
+        print(f"⏭️  {len(completed)} configs already completed (per {manifest_path.name})")
+    
     # Run experiments
     success_count = 0
     fail_count = 0
     
-    for i, config in enumerate(configs):
-        if i < args.resume_from:
-            print(f"⏭️  Skipping experiment {i} (resume point)")
-            continue
-        
-        print(f"\n📊 Experiment {i+1}/{len(configs)}")
-        
-        success = run_single_experiment(
-            workload=config[0],
-            data_dist=config[1],
-            num_clients=config[2],
-            net_profile=config[3],
-            sec_config=config[4],
-            seed=config[5],
-            results_dir=args.results_dir
+    if args.workers > 1:
+        success_count, fail_count = run_matrix_parallel(
+            (c for c in configs if config_key(c) not in completed),
+            args.results_dir, args.workers, args.on_failure, manifest_path
         )
-        
-        if success:
-            success_count += 1
-        else:
-            fail_count += 1
-            print("⚠️  Continuing despite failure (auto-continue enabled)")
-            # Continue automatically - no user input needed
+    else:
+        for i, config in enumerate(configs, start=args.resume_from):
+            if config_key(config) in completed:
+                print(f"⏭️  Skipping experiment {i} (already completed)")
+                continue
+            
+            print(f"\n📊 Experiment {i+1}/{total}")
+            
+            run_id = run_single_experiment(
+                workload=config[0],
+                data_dist=config[1],
+                num_clients=config[2],
+                net_profile=config[3],
+                sec_config=config[4],
+                seed=config[5],
+                results_dir=args.results_dir
+            )
+            
+            if run_id:
+                success_count += 1
+                record_completed(manifest_path, config, run_id)
+            else:
+                fail_count += 1
+                if not continue_after_failure(args.on_failure):
+                    break
     
     print("\n" + "="*80)
     print("🏁 Experiment run complete")
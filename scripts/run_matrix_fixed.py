@@ -6,9 +6,15 @@ Automatically runs the full experiment matrix by calling run_one.py for each con
 """
 
 import argparse
+import hashlib
 import itertools
+import json
+import math
+import multiprocessing
+import os
 import subprocess
-import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
 import sys
@@ -34,50 +40,77 @@ NETWORK_PROFILES = ['NET0', 'NET2', 'NET4']
 SECURITY_CONFIGS = ['SEC0', 'SEC1', 'SEC2', 'SEC3']
 SEEDS = [0, 1, 2, 3, 4]
 
+# Default namespace; parallel workers each get a numbered copy of it
+NAMESPACE = "fl-experiment"
 
-def generate_run_id(workload, data_dist, num_clients, net_profile, sec_config, seed):
-    """Generate unique run ID"""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    return f"{timestamp}_{workload}_{data_dist}_{num_clients}c_{net_profile}_{sec_config}_seed{seed}"
+# Namespace owned by this worker process (set by _init_worker)
+_worker_namespace = NAMESPACE
+
+# Network profile of the previous run; netem is node-wide and outlives a
+# run, so the node is reset whenever the profile changes
+_applied = {"net_profile": None}
+
+
+def generate_run_id(net_profile, sec_config):
+    """
+    Generate unique run ID, passed to run_one.py as --run-id
+    
+    Same Kubernetes DNS-compliant format run_one.py generates itself, so the
+    id names the run's resources and results directory; the random suffix
+    keeps parallel runs started in the same second apart.
+    """
+    return (f"{sec_config.lower()}-{net_profile.lower()}-"
+            f"{int(datetime.now().timestamp())}-{uuid.uuid4().hex[:6]}")
+
+
+def _run(cmd, **kwargs):
+    """
+    Run a command that must succeed; print what failed and raise
+    CalledProcessError (output is captured unless the caller overrides it)
+    """
+    kwargs.setdefault("capture_output", True)
+    kwargs.setdefault("text", True)
+    try:
+        return subprocess.run(cmd, check=True, **kwargs)
+    except subprocess.CalledProcessError as e:
+        print(f"❌ Command failed (rc={e.returncode}): {' '.join(map(str, cmd))}")
+        if e.stderr:
+            print(e.stderr)
+        raise
 
 
 def wait_for_cluster_ready():
     """Wait for cluster to be in clean state"""
     print("⏳ Waiting for cluster stabilization...")
-    time.sleep(10)
-    
-    # Check node status
-    result = subprocess.run(
-        ["kubectl", "get", "nodes"],
-        capture_output=True,
-        text=True
-    )
-    print(result.stdout)
     
-    if result.returncode != 0:
+    # Block until every node reports Ready (returns at once if they already do)
+    try:
+        result = _run(["kubectl", "wait", "--for=condition=Ready", "nodes", "--all", "--timeout=60s"])
+    except subprocess.CalledProcessError:
         print("❌ Cluster not ready")
         return False
     
+    print(result.stdout)
     return True
 
 
-def ensure_namespace():
+def ensure_namespace(namespace=NAMESPACE):
     """Ensure namespace exists (create if needed)"""
     result = subprocess.run(
-        ["kubectl", "get", "namespace", "fl-experiment"],
+        ["kubectl", "get", "namespace", namespace],
         capture_output=True
     )
     
     if result.returncode != 0:
         # Namespace doesn't exist, create it
-        print("🔧 Creating namespace fl-experiment...")
+        print(f"🔧 Creating namespace {namespace}...")
         subprocess.run(
-            ["kubectl", "create", "namespace", "fl-experiment"],
+            ["kubectl", "create", "namespace", namespace],
             capture_output=True
         )
         print("✅ Namespace created")
     else:
-        print("✅ Namespace fl-experiment already exists")
+        print(f"✅ Namespace {namespace} already exists")
 
 
 def reset_network():
@@ -89,10 +122,38 @@ def reset_network():
     )
 
 
-def run_single_experiment(workload, data_dist, num_clients, net_profile, sec_config, seed, results_dir):
-    """Run a single experiment configuration by calling run_one.py"""
+def switch_network_profile(profile):
+    """Reset network emulation and apply `profile` node-wide; returns success"""
+    reset_network()
+    if profile == "NET0":
+        print(f"📡 Network profile: {profile} (no impairment)")
+        return True
+    
+    print(f"📡 Applying network profile: {profile}")
+    result = subprocess.run(
+        ["bash", "scripts/netem_apply.sh", profile],
+        cwd=Path(__file__).parent.parent
+    )
+    if result.returncode != 0:
+        print(f"❌ Failed to apply network profile: {profile}")
+        return False
+    return True
+
+
+def run_single_experiment(workload, data_dist, num_clients, net_profile, sec_config, seed, results_dir,
+                          namespace=NAMESPACE, manage_network=True):
+    """
+    Run a single experiment configuration by calling run_one.py
     
-    run_id = generate_run_id(workload, data_dist, num_clients, net_profile, sec_config, seed)
+    run_one.py applies net_profile to the whole node; when the profile
+    differs from the previous run's, the node is reset first so no earlier
+    delay or loss carries over. With manage_network=False the caller has
+    already applied net_profile (netem is node-wide, so parallel runs share
+    one profile per batch) and run_one.py leaves it alone.
+    Returns the run_id on success, False on failure.
+    """
+    
+    run_id = generate_run_id(net_profile, sec_config)
     
     print("\n" + "="*80)
     print(f"🚀 Starting run: {run_id}")
@@ -100,12 +161,13 @@ def run_single_experiment(workload, data_dist, num_clients, net_profile, sec_con
     print("="*80)
     
     # Step 1: Ensure namespace exists
-    ensure_namespace()
+    ensure_namespace(namespace)
     
-    # Step 2: Reset network
-    reset_network()
+    if manage_network and _applied["net_profile"] != net_profile:
+        reset_network()
+        _applied["net_profile"] = net_profile
     
-    # Step 3: Run experiment using run_one.py
+    # Step 2: Run experiment using run_one.py
     script_dir = Path(__file__).parent
     num_rounds = WORKLOADS[workload]['num_rounds']
     
@@ -116,68 +178,201 @@ def run_single_experiment(workload, data_dist, num_clients, net_profile, sec_con
         "--net-profile", net_profile,
         "--num-clients", str(num_clients),
         "--num-rounds", str(num_rounds),
-        "--data-seed", str(seed)
+        "--data-seed", str(seed),
+        "--namespace", namespace,
+        "--run-id", run_id,
+        # Let the previous run's pods terminate while the next one starts
+        "--background-cleanup"
     ]
     
+    if not manage_network:
+        cmd.append("--keep-netem")
+    
     # Add IID/non-IID flag
     if data_dist == "iid":
         cmd.append("--iid")
     
     print(f"🔧 Command: {' '.join(cmd)}")
     
-    result = subprocess.run(
-        cmd,
-        cwd=script_dir.parent
-    )
-    
-    if result.returncode != 0:
+    try:
+        # run_one.py's event log streams straight to the console
+        _run(cmd, cwd=script_dir.parent, capture_output=False)
+    except subprocess.CalledProcessError:
         print(f"❌ Failed run: {run_id}")
         return False
     
     print(f"✅ Completed run: {run_id}\n")
+    return run_id
+
+
+def config_key(config):
+    """Stable identity of a config tuple, independent of its matrix position"""
+    return hashlib.sha1(repr(tuple(config)).encode()).hexdigest()
+
+
+def load_completed(manifest_path):
+    """Keys of every config recorded in the completion manifest"""
+    if not manifest_path.exists():
+        return set()
+    with open(manifest_path) as f:
+        return {config_key(json.loads(line)["config"]) for line in f if line.strip()}
+
+
+def record_completed(manifest_path, config, run_id):
+    """Append a finished run to the completion manifest, durably"""
+    with open(manifest_path, "a") as f:
+        f.write(json.dumps({"config": list(config), "run_id": run_id}) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def continue_after_failure(on_failure):
+    """Apply the --on-failure policy; returns False when the matrix should stop"""
+    if on_failure == "abort":
+        print("🛑 Aborting after failure (--on-failure=abort)")
+        return False
+    if on_failure == "prompt":
+        return input("❓ Continue despite failure? [Y/n] ").strip().lower() not in ("n", "no")
+    print("⚠️  Continuing despite failure (auto-continue enabled)")
     return True
 
 
-def generate_experiment_list(tier="core"):
-    """Generate list of experiment configurations"""
+def _init_worker(slot_counter):
+    """Claim a slot, and with it a dedicated namespace, for this worker process"""
+    global _worker_namespace
+    with slot_counter.get_lock():
+        slot_id = slot_counter.value
+        slot_counter.value += 1
+    _worker_namespace = f"{NAMESPACE}-{slot_id}"
+
+
+def run_one_in_slot(config, results_dir):
+    """Run one config in this worker's namespace (network profile already applied)"""
+    return run_single_experiment(*config, results_dir=results_dir,
+                                 namespace=_worker_namespace, manage_network=False)
+
+
+def run_matrix_parallel(configs, results_dir, workers, on_failure="continue", manifest_path=None):
+    """
+    Run configs concurrently, one namespace per worker process
+    
+    Network emulation applies to the whole node, so configs are batched by
+    network profile: each batch runs under a single apply of that profile
+    and is drained before the next profile is applied.
+    On a failure the --on-failure policy decides whether queued runs are
+    cancelled (runs already in flight finish). Successful runs are appended
+    to manifest_path when given. Returns (success_count, fail_count).
+    """
+    success_count = 0
+    fail_count = 0
+    done = 0
+    
+    slot_counter = multiprocessing.Value('i', 0)
+    # The matrix is already profile-major, so this stable sort only
+    # regroups filtered or resumed configs
+    by_profile = sorted(configs, key=lambda c: c[3])
+    total = len(by_profile)
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(slot_counter,)) as executor:
+        aborted = False
+        for net_profile, group in itertools.groupby(by_profile, key=lambda c: c[3]):
+            if aborted:
+                break
+            group = list(group)
+            
+            if not switch_network_profile(net_profile):
+                print(f"❌ Skipping {len(group)} runs for {net_profile}")
+                fail_count += len(group)
+                done += len(group)
+                continue
+            
+            futures = {executor.submit(run_one_in_slot, config, results_dir): config for config in group}
+            for future in as_completed(futures):
+                if future.cancelled():
+                    continue
+                done += 1
+                run_id = future.result()
+                if run_id:
+                    success_count += 1
+                    if manifest_path is not None:
+                        record_completed(manifest_path, futures[future], run_id)
+                else:
+                    fail_count += 1
+                    if not aborted and not continue_after_failure(on_failure):
+                        aborted = True
+                        for pending in futures:
+                            pending.cancel()
+                print(f"\n📊 Experiment {done}/{total} finished: {futures[future]}")
+    
+    # Leave the node unshaped for whatever runs next
+    reset_network()
+    return success_count, fail_count
+
+
+def experiment_dimensions(tier="core"):
+    """Per-dimension value lists for a tier, in itertools.product order"""
     
     if tier == "core":
         # Tier 1: Core set (80 runs)
         # mnist × [iid, noniid] × 5 clients × [NET0, NET2] × [SEC0-SEC3] × 5 seeds
-        configs = list(itertools.product(
+        dims = (
             ['mnist'],           # workload
             DATA_DISTRIBUTIONS,  # iid, noniid
             [5],                 # num_clients
             ['NET0', 'NET2'],    # network_profiles
             SECURITY_CONFIGS,    # SEC0-SEC3
             SEEDS                # seeds 0-4
-        ))
+        )
     elif tier == "extended":
         # Tier 2: Extended set (320 runs)
         # Add 10 clients and NET4
-        configs = list(itertools.product(
+        dims = (
             ['mnist'],
             DATA_DISTRIBUTIONS,
             NUM_CLIENTS_LIST,
             NETWORK_PROFILES,
             SECURITY_CONFIGS,
             SEEDS
-        ))
+        )
     elif tier == "full":
         # Tier 3: Full set (480 runs)
         # Add CIFAR-10
-        configs = list(itertools.product(
-            WORKLOADS.keys(),
+        dims = (
+            list(WORKLOADS),
             DATA_DISTRIBUTIONS,
             NUM_CLIENTS_LIST,
             NETWORK_PROFILES,
             SECURITY_CONFIGS,
             SEEDS
-        ))
+        )
     else:
         raise ValueError(f"Unknown tier: {tier}")
     
-    return configs
+    return dims
+
+
+def generate_experiment_list(tier="core"):
+    """
+    Lazily generate experiment configurations
+    
+    Tuples keep the (workload, data_dist, num_clients, net_profile,
+    sec_config, seed) layout, but iteration nests the costly-to-switch
+    dimensions outermost so consecutive runs mostly share a network and
+    security setup; data distribution and seed vary fastest.
+    """
+    workloads, data_dists, num_clients, net_profiles, sec_configs, seeds = experiment_dimensions(tier)
+    return (
+        (workload, data_dist, n_clients, net_profile, sec_config, seed)
+        for workload, n_clients, net_profile, sec_config, data_dist, seed in itertools.product(
+            workloads, num_clients, net_profiles, sec_configs, data_dists, seeds
+        )
+    )
+
+
+def count_experiments(tier="core"):
+    """Number of configurations in a tier, without generating them"""
+    return math.prod(len(values) for values in experiment_dimensions(tier))
 
 
 def main():
@@ -203,24 +398,43 @@ def main():
         "--resume-from",
         type=int,
         default=0,
-        help="Resume from experiment number (0-indexed)"
+        help="Resume from experiment number (0-indexed); configs already in "
+             "<results-dir>/_completed.jsonl are skipped regardless"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Experiments to run concurrently, each in its own namespace"
+    )
+    parser.add_argument(
+        "--on-failure",
+        choices=["continue", "prompt", "abort"],
+        default="continue",
+        help="What to do after a failed run (prompt needs an interactive stdin)"
     )
     
     args = parser.parse_args()
     
+    if args.on_failure == "prompt" and not sys.stdin.isatty():
+        # Nobody can answer under nohup/CI/detached tmux; never block the matrix
+        print("⚠️  --on-failure=prompt needs a TTY on stdin; continuing on failures instead")
+        args.on_failure = "continue"
+    
     # Create results directory
     args.results_dir.mkdir(parents=True, exist_ok=True)
     
-    # Generate experiment list
-    configs = generate_experiment_list(args.tier)
+    # Generate experiment list lazily; resuming is a plain islice
+    total = count_experiments(args.tier)
+    configs = itertools.islice(generate_experiment_list(args.tier), args.resume_from, None)
     
     print(f"📊 Experiment tier: {args.tier}")
-    print(f"📊 Total experiments: {len(configs)}")
+    print(f"📊 Total experiments: {total}")
     print(f"📁 Results directory: {args.results_dir}")
     
     if args.dry_run:
         print("\n🔍 Dry run - experiment list:")
-        for i, config in enumerate(configs):
+        for i, config in enumerate(configs, start=args.resume_from):
             print(f"  {i}: {config}")
         sys.exit(0)
     
@@ -229,34 +443,51 @@ def main():
         print("❌ Cluster not ready. Exiting.")
         sys.exit(1)
     
+    # Clear any node-level netem left behind by an earlier invocation
+    reset_network()
+    
+    # Configs recorded as finished by earlier invocations are skipped by
+    # identity, so a reordered matrix cannot make --resume-from point wrong
+    manifest_path = args.results_dir / "_completed.jsonl"
+    completed = load_completed(manifest_path)
+    if completed:
+        print(f"⏭️  {len(completed)} configs already completed (per {manifest_path.name})")
+    
     # Run experiments
     success_count = 0
     fail_count = 0
     
-    for i, config in enumerate(configs):
-        if i < args.resume_from:
-            print(f"⏭️  Skipping experiment {i} (resume point)")
-            continue
-        
-        print(f"\n📊 Experiment {i+1}/{len(configs)}")
-        
-        success = run_single_experiment(
-            workload=config[0],
-            data_dist=config[1],
-            num_clients=config[2],
-            net_profile=config[3],
-            sec_config=config[4],
-            seed=config[5],
-            results_dir=args.results_dir
+    if args.workers > 1:
+        success_count, fail_count = run_matrix_parallel(
+            (c for c in configs if config_key(c) not in completed),
+            args.results_dir, args.workers, args.on_failure, manifest_path
         )
+    else:
+        for i, config in enumerate(configs, start=args.resume_from):
+            if config_key(config) in completed:
+                print(f"⏭️  Skipping experiment {i} (already completed)")
+                continue
+            
+            print(f"\n📊 Experiment {i+1}/{total}")
+            
+            run_id = run_single_experiment(
+                workload=config[0],
+                data_dist=config[1],
+                num_clients=config[2],
+                net_profile=config[3],
+                sec_config=config[4],
+                seed=config[5],
+                results_dir=args.results_dir
+            )
+            
+            if run_id:
+                success_count += 1
+                record_completed(manifest_path, config, run_id)
+            else:
+                fail_count += 1
+                if not continue_after_failure(args.on_failure):
+                    break
         
-        if success:
-            success_count += 1
-        else:
-            fail_count += 1
-            print("⚠️  Continuing despite failure (auto-continue enabled)")
-            # Continue automatically - no user input needed
-    
     print("\n" + "="*80)
     print("🏁 Experiment run complete")
     print(f"✅ Successful: {success_count}")
@@ -13,45 +13,126 @@ This script:
 """
 
 import argparse
+import atexit
+import functools
+import http.client
 import subprocess
 import time
 import json
+import uuid
 import yaml
 import os
+import re
+import shutil
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
+from urllib.parse import urlencode
+
+
+# Manifest directory for each security configuration
+MANIFEST_DIRS = {
+    "SEC0": Path("k8s/00-baseline"),
+    "SEC1": Path("k8s/10-networkpolicy"),
+    "SEC2": Path("k8s/20-mtls"),
+    "SEC3": Path("k8s/25-combined"),
+}
+
+# Caller-supplied --run-id: a DNS label of at most 40 characters
+RUN_ID_PATTERN = re.compile(r"[a-z]([-a-z0-9]{0,38}[a-z0-9])?")
+
+# Events that flush the buffered log stream: run boundaries, and the last
+# line printed before a long blocking wait
+FLUSH_EVENTS = {
+    "experiment_start", "experiment_success", "experiment_failed", "experiment_error",
+    "wait_server_start", "wait_completion_start",
+}
+
+
+# (unix second, "YYYY-MM-DDTHH:MM:SS" for it): most events in a burst share the
+# second, so only the microseconds need formatting
+_ts_cache = (None, "")
+
+
+def utc_timestamp() -> str:
+    """ISO-8601 UTC timestamp with microseconds, e.g. 2024-01-01T12:00:00.123456Z"""
+    global _ts_cache
+    now = time.time()
+    sec = int(now)
+    cached_sec, prefix = _ts_cache
+    if sec != cached_sec:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(sec))
+        _ts_cache = (sec, prefix)
+    return f"{prefix}.{int((now - sec) * 1e6):06d}Z"
+
+
+# Bound encode of a default encoder: json.dumps(obj) with no options ends up
+# here too, after re-checking its keyword arguments on every call
+_encode_json = json.JSONEncoder().encode
 
 
 def log_event(event: str, **kwargs):
     """Log structured JSON event"""
     log_data = {
-        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "timestamp": utc_timestamp(),
         "event": event,
         **kwargs
     }
-    print(json.dumps(log_data), flush=True)
+    # One write per line so events from worker threads never interleave;
+    # stdout stays block-buffered in between flush points
+    sys.stdout.write(_encode_json(log_data) + "\n")
+    if event in FLUSH_EVENTS:
+        sys.stdout.flush()
+
+
+@functools.lru_cache(maxsize=None)
+def _resolve_executable(name: str) -> str:
+    return shutil.which(name) or name
+
+
+def spawn_argv(cmd: list) -> list:
+    """
+    Command with its executable resolved to an absolute path
+    
+    subprocess only uses posix_spawn (no fork of this process's page tables)
+    when the executable has a directory part and close_fds=False, so callers
+    pass both. close_fds=False is safe: Python creates every fd
+    non-inheritable (PEP 446), so children only get their own stdio.
+    """
+    return [_resolve_executable(cmd[0]), *cmd[1:]]
 
 
-def run_command(cmd: list, check=True, capture_output=True):
-    """Execute shell command and return result"""
-    log_event("command_start", command=" ".join(cmd))
+def run_command(cmd: list, check=True, capture_output=True, quiet=False, input=None, decode=True):
+    """
+    Execute shell command and return result
+    
+    quiet=True is for polls inside wait loops: the command_start/command_end
+    pair is only logged when the command fails. decode=False keeps stdout,
+    stderr (and input) as bytes, for callers that never read the output as text.
+    """
+    if not quiet:
+        log_event("command_start", command=" ".join(cmd))
     start = time.time()
     
     try:
         result = subprocess.run(
-            cmd,
+            spawn_argv(cmd),
+            close_fds=False,
             check=check,
             capture_output=capture_output,
-            text=True
+            input=input,
+            text=decode
         )
         duration = time.time() - start
-        log_event(
-            "command_end",
-            command=" ".join(cmd),
-            duration_sec=duration,
-            returncode=result.returncode
-        )
+        if not quiet or result.returncode != 0:
+            log_event(
+                "command_end",
+                command=" ".join(cmd),
+                duration_sec=duration,
+                returncode=result.returncode
+            )
         return result
     except subprocess.CalledProcessError as e:
         duration = time.time() - start
@@ -60,31 +141,208 @@ def run_command(cmd: list, check=True, capture_output=True):
             command=" ".join(cmd),
             duration_sec=duration,
             returncode=e.returncode,
-            stderr=e.stderr if capture_output else None
+            stderr=(e.stderr if decode else e.stderr.decode(errors="replace")) if capture_output else None
         )
         raise
 
 
-def wait_pods_ready(namespace: str, label: str, timeout: int = 180) -> bool:
-    """Wait for pods to be Ready with kubectl wait"""
-    log_event("wait_pods_ready_start", namespace=namespace, label=label, timeout_sec=timeout)
+# `kubectl proxy` authenticates to the API server once; read-only queries then
+# go over one keep-alive HTTP connection to it instead of a kubectl process
+# (exec + kubeconfig + TLS handshake) each. Unset if the proxy is unavailable,
+# in which case callers fall back to kubectl.
+_api = {"proc": None, "conn": None, "lock": threading.Lock()}
+
+
+def start_api_proxy() -> bool:
+    """Start `kubectl proxy` on a free local port for api_get()"""
+    proc = subprocess.Popen(
+        spawn_argv(["kubectl", "proxy", "--port=0"]),
+        close_fds=False,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True
+    )
+    # First line: "Starting to serve on 127.0.0.1:<port>" (EOF if it failed)
+    host, _, port = proc.stdout.readline().strip().rpartition(" ")[2].rpartition(":")
+    if not port.isdigit():
+        proc.kill()
+        proc.wait()
+        log_event("api_proxy_unavailable")
+        return False
+    
+    _api["proc"] = proc
+    _api["conn"] = http.client.HTTPConnection(host, int(port), timeout=30)
+    atexit.register(stop_api_proxy)
+    log_event("api_proxy_start", port=int(port))
+    return True
+
+
+def stop_api_proxy():
+    if _api["conn"] is not None:
+        _api["conn"].close()
+        _api["conn"] = None
+    if _api["proc"] is not None:
+        _api["proc"].kill()
+        _api["proc"].wait()
+        _api["proc"] = None
+
+
+def api_get(path: str, **params):
+    """GET an API path through the proxy; parsed JSON, or None if unavailable/failed"""
+    if _api["conn"] is None:
+        return None
+    
+    url = f"{path}?{urlencode(params)}" if params else path
+    with _api["lock"]:
+        conn = _api["conn"]
+        try:
+            conn.request("GET", url)
+            response = conn.getresponse()
+            body = response.read()
+        except (OSError, http.client.HTTPException):
+            conn.close()  # reconnects on the next request
+            return None
+    
+    if response.status != 200:
+        return None
+    return json.loads(body)
+
+
+def list_run_pods(namespace: str, run_id: str, quiet=False) -> dict:
+    """
+    List this run's pods in one API call, grouped by app label
+    
+    Returns e.g. {"fl-server": ["fl-server-..."], "fl-client": [...]}, so
+    callers that need both server and client pods share a single round-trip.
+    """
+    pods = {}
+    data = api_get(f"/api/v1/namespaces/{namespace}/pods", labelSelector=f"run-id={run_id}")
+    if data is not None:
+        for item in data["items"]:
+            app = item["metadata"].get("labels", {}).get("app", "")
+            pods.setdefault(app, []).append(item["metadata"]["name"])
+        return pods
     
     result = run_command([
-        "kubectl", "wait",
-        "--for=condition=Ready",
-        "pod",
+        "kubectl", "get", "pods",
         "-n", namespace,
-        "-l", label,
-        f"--timeout={timeout}s"
-    ], check=False)
+        "-l", f"run-id={run_id}",
+        "-o", "jsonpath={range .items[*]}{.metadata.labels.app}{\"\\t\"}{.metadata.name}{\"\\n\"}{end}"
+    ], check=False, quiet=quiet)
+    
+    for line in result.stdout.splitlines():
+        app, _, name = line.partition("\t")
+        if name:
+            pods.setdefault(app, []).append(name)
+    return pods
+
+
+def wait_pods_ready(namespace: str, label: str, timeout: int = 180, min_pods: int = 1) -> list:
+    """
+    Wait for pods to be Ready with kubectl wait
+    
+    Returns the names of the Ready pods (empty on timeout/failure), taken from
+    kubectl wait's own "pod/<name> condition met" lines, so callers need no
+    follow-up listing. kubectl wait only covers the pods that already exist,
+    so it is repeated until at least min_pods of them are Ready.
+    """
+    log_event("wait_pods_ready_start", namespace=namespace, label=label, timeout_sec=timeout)
+    deadline = time.time() + timeout
+    attempt = 0
+    ready = []
+    
+    while True:
+        remaining = int(deadline - time.time())
+        if remaining <= 0:
+            break
+        
+        # One blocking kubectl wait (backed by an apiserver watch) instead of
+        # re-listing the pods
+        result = run_command([
+            "kubectl", "wait",
+            "--for=condition=Ready",
+            "pod",
+            "-n", namespace,
+            "-l", label,
+            f"--timeout={remaining}s"
+        ], check=False, quiet=True)
+        
+        if result.returncode == 0:
+            ready = [line.split()[0].partition("/")[2] for line in result.stdout.splitlines() if line.strip()]
+            if len(ready) >= min_pods:
+                break
+        # kubectl wait fails immediately while the pods do not exist yet
+        elif "no matching resources" not in result.stderr:
+            break
+        time.sleep(backoff_delay(attempt))
+        attempt += 1
     
-    success = result.returncode == 0
-    log_event("wait_pods_ready_end", namespace=namespace, label=label, success=success)
-    return success
+    if len(ready) < min_pods:
+        ready = []
+    log_event("wait_pods_ready_end", namespace=namespace, label=label, success=bool(ready))
+    return ready
+
+
+# netem_apply.sh failures that a retry cannot fix
+NETEM_PERMANENT_ERRORS = ("permission denied", "unknown profile", "usage:", "not found", "forbidden")
 
 
-def apply_network_profile(profile: str, namespace: str, run_id: str):
-    """Apply tc/netem network emulation profile to current run client pods only"""
+def apply_netem(profile: str) -> bool:
+    """
+    Run netem_apply.sh for a profile, retrying up to 5 times
+    
+    Transient failures (e.g. a dropped minikube ssh) back off exponentially
+    from 0.25 s, capped at 2 s; permanent ones give up immediately.
+    """
+    netem_script = Path(__file__).parent / "netem_apply.sh"
+    
+    for attempt in range(1, 6):
+        log_event("network_profile_apply_try", profile=profile, attempt=attempt)
+        result = run_command([str(netem_script), profile], check=False)
+        
+        if result.returncode == 0:
+            log_event("network_profile_apply_success", profile=profile, attempt=attempt)
+            return True
+        
+        # The script reports some errors on stdout, so both streams are checked
+        output = f"{result.stdout}\n{result.stderr}".lower()
+        if any(marker in output for marker in NETEM_PERMANENT_ERRORS):
+            log_event("network_profile_apply_permanent_error", profile=profile, attempt=attempt,
+                      returncode=result.returncode, stderr=result.stderr)
+            return False
+        
+        log_event("network_profile_apply_retry", profile=profile, attempt=attempt, 
+                 returncode=result.returncode, stderr=result.stderr)
+        if attempt < 5:
+            time.sleep(backoff_delay(attempt - 1, base=0.25, cap=2))
+    
+    return False
+
+
+def reset_netem() -> bool:
+    """
+    Remove the node-wide netem qdisc with netem_reset.sh
+    
+    A failed reset is logged but not fatal (there may be nothing to remove).
+    """
+    netem_script = Path(__file__).parent / "netem_reset.sh"
+    result = run_command([str(netem_script)], check=False)
+    log_event("network_profile_reset", returncode=result.returncode)
+    return result.returncode == 0
+
+
+def apply_network_profile(profile: str, namespace: str, run_id: str, num_clients: int = 1):
+    """
+    Apply tc/netem network emulation profile once this run's client pods are Ready
+    
+    netem_apply.sh shapes the node interfaces (via minikube ssh or kubectl
+    debug), which carry every pod's traffic, so it runs once per run rather
+    than once per pod. That shaping outlives the run, so the node is reset
+    first: a NET0 run must not inherit an earlier run's delay and loss, and
+    the apply's `tc qdisc add` must not meet a stale qdisc.
+    """
+    reset_netem()
+    
     if profile == "NET0":
         # No network constraints (baseline)
         log_event("network_profile_skip", profile=profile, reason="baseline")
@@ -93,259 +351,368 @@ def apply_network_profile(profile: str, namespace: str, run_id: str):
     # ✅ Only target pods from current run (avoid old terminating pods)
     selector = f"app=fl-client,run-id={run_id}"
     
-    # ✅ Wait until client pods are Ready (critical for kubectl exec)
+    # ✅ Wait until all client pods exist and are Ready (before training starts)
+    # (returns the ready pods of this specific run)
     log_event("network_profile_wait_ready", profile=profile, selector=selector)
-    if not wait_pods_ready(namespace, selector, timeout=180):
+    pods = wait_pods_ready(namespace, selector, timeout=180, min_pods=num_clients)
+    if not pods:
         log_event("network_profile_failed", profile=profile, reason="pods_not_ready", selector=selector)
         raise RuntimeError(f"Client pods not Ready for run {run_id} before netem apply")
     
-    # Get ready pods for this specific run
-    result = run_command([
-        "kubectl", "get", "pods",
-        "-n", namespace,
-        "-l", selector,
-        "-o", "jsonpath={.items[*].metadata.name}"
-    ], check=False)
-    
-    pods = result.stdout.strip().split()
-    if not pods:
-        log_event("network_profile_failed", profile=profile, reason="no_pods_after_ready", selector=selector)
-        raise RuntimeError(f"No client pods found for run {run_id}")
-    
     log_event("network_profile_apply_start", profile=profile, run_id=run_id, pods=pods)
     
-    # Apply netem with retry logic (kubectl exec can be flaky)
-    netem_script = Path(__file__).parent / "netem_apply.sh"
-    
-    for pod in pods:
-        success = False
-        for attempt in range(1, 6):  # Retry up to 5 times
-            log_event("network_profile_apply_try", profile=profile, pod=pod, attempt=attempt)
-            result = run_command([
-                str(netem_script),
-                namespace,
-                pod,
-                profile
-            ], check=False)
-            
-            if result.returncode == 0:
-                success = True
-                log_event("network_profile_apply_success", profile=profile, pod=pod, attempt=attempt)
-                break
-            else:
-                log_event("network_profile_apply_retry", profile=profile, pod=pod, attempt=attempt, 
-                         returncode=result.returncode, stderr=result.stderr)
-                time.sleep(2)  # Brief wait before retry
-        
-        if not success:
-            log_event("network_profile_apply_failed", profile=profile, pod=pod, run_id=run_id)
-            raise RuntimeError(f"netem apply failed for pod {pod} after 5 attempts")
+    # Apply netem with retry logic (kubectl debug / minikube ssh can be flaky)
+    if not apply_netem(profile):
+        log_event("network_profile_apply_failed", profile=profile, run_id=run_id)
+        raise RuntimeError(f"netem apply failed for profile {profile}")
     
     log_event("network_profile_apply_complete", profile=profile, run_id=run_id, pod_count=len(pods))
 
 
-def inject_run_id(manifest_path: Path, run_id: str, output_path: Path, num_rounds: int = None, 
-                  num_clients: int = None, is_iid: bool = None, data_seed: int = None):
-    """Replace PLACEHOLDER and inject experiment parameters into manifest"""
-    with open(manifest_path) as f:
-        content = f.read()
-    
-    # Replace all PLACEHOLDER occurrences with actual RUN_ID
-    content = content.replace('run-id: "PLACEHOLDER"', f'run-id: "{run_id}"')
-    content = content.replace('PLACEHOLDER', run_id)  # Replace resource names too
-    
-    # Inject --num-rounds if provided
-    if num_rounds is not None:
-        content = content.replace('- "--num-rounds=10"', f'- "--num-rounds={num_rounds}"')
+def load_manifest(manifest_path: Path) -> list:
+    """Parsed manifest documents; callers must not mutate the result"""
+    return _parse_manifest(str(manifest_path), os.path.getmtime(manifest_path))
+
+
+@functools.lru_cache(maxsize=len(MANIFEST_DIRS))
+def _parse_manifest(path: str, mtime: float) -> list:
+    # mtime is part of the cache key so an edited manifest is re-read; one
+    # slot per SEC level lets superseded versions fall out of the cache
+    with open(path) as f:
+        return [doc for doc in yaml.safe_load_all(f) if doc]
+
+
+def _substitute(node, replacements: dict):
+    """
+    Apply text replacements to every string in a parsed YAML tree
     
-    # Inject --min-clients if provided
-    if num_clients is not None:
-        content = content.replace('- "--min-clients=5"', f'- "--min-clients={num_clients}"')
+    Builds a new tree, so the cached manifest it reads from stays untouched.
+    """
+    if isinstance(node, dict):
+        return {k: _substitute(v, replacements) for k, v in node.items()}
+    if isinstance(node, list):
+        return [_substitute(v, replacements) for v in node]
+    if isinstance(node, str):
+        for old, new in replacements.items():
+            node = node.replace(old, new)
+    return node
+
+
+def _set_arg(args: list, flag: str, value=None):
+    """Set `flag=value` in a container args list, replacing any existing value"""
+    arg = flag if value is None else f"{flag}={value}"
+    for i, existing in enumerate(args):
+        if existing == flag or existing.startswith(f"{flag}="):
+            args[i] = arg
+            return
+    args.append(arg)
+
+
+def inject_run_id(manifest_path: Path, run_id: str, num_rounds: int = None, 
+                  num_clients: int = None, is_iid: bool = None, data_seed: int = None,
+                  namespace: str = "fl-experiment") -> str:
+    """Replace PLACEHOLDER and inject experiment parameters; returns the manifest YAML"""
+    # Parse once and edit the structure instead of rescanning the text per flag
+    docs = load_manifest(manifest_path)
     
-    # Add --iid flag in client args if needed (add after data_seed)
-    # Server doesn't need this, only clients
-    if is_iid is not None and is_iid:
-        # For client Jobs, add --iid flag
-        content = content.replace(
-            f'- "--server-address=fl-server-{run_id}:8080"',
-            f'- "--server-address=fl-server-{run_id}:8080"\n          - "--iid"'
-        )
+    # Retarget the namespace (used by parallel matrix workers) and replace all
+    # PLACEHOLDER occurrences (labels, resource names, server address) with RUN_ID
+    docs = _substitute(docs, {"fl-experiment": namespace, "PLACEHOLDER": run_id})
     
-    # Inject data_seed if provided (for clients)
-    if data_seed is not None:
-        # Add after server-address for clients
-        if '--iid' not in content.replace(f'- "--server-address=fl-server-{run_id}:8080"', ''):
-            content = content.replace(
-                f'- "--server-address=fl-server-{run_id}:8080"',
-                f'- "--server-address=fl-server-{run_id}:8080"\n          - "--data-seed={data_seed}"'
-            )
-        else:
-            content = content.replace(
-                '- "--iid"',
-                f'- "--iid"\n          - "--data-seed={data_seed}"'
-            )
+    for doc in docs:
+        kind = doc.get("kind")
+        if kind == "Namespace":
+            continue
+        
+        # Label every run object (what cleanup/log collection select on), and
+        # scope the server Service/Deployment selectors to this run so a
+        # previous run's still-terminating server pod is never picked up
+        doc["metadata"].setdefault("labels", {})["run-id"] = run_id
+        if kind == "Service":
+            doc["spec"].setdefault("selector", {})["run-id"] = run_id
+            continue
+        if kind not in ("Deployment", "Job"):
+            continue
+        doc["spec"]["template"]["metadata"].setdefault("labels", {})["run-id"] = run_id
+        if kind == "Deployment":
+            doc["spec"]["selector"].setdefault("matchLabels", {})["run-id"] = run_id
+        
+        for container in doc["spec"]["template"]["spec"]["containers"]:
+            args = container.setdefault("args", [])
+            
+            if container["name"] == "fl-server":
+                if num_rounds is not None:
+                    _set_arg(args, "--num-rounds", num_rounds)
+                if num_clients is not None:
+                    _set_arg(args, "--min-clients", num_clients)
+            else:
+                # Server doesn't need the data split flags, only clients
+                if is_iid is not None:
+                    if is_iid:
+                        _set_arg(args, "--iid")
+                    else:
+                        args[:] = [a for a in args if a != "--iid"]
+                if data_seed is not None:
+                    _set_arg(args, "--data-seed", data_seed)
     
-    with open(output_path, 'w') as f:
-        f.write(content)
+    manifest = yaml.safe_dump_all(docs, sort_keys=False)
     
     log_event(
         "manifest_prepared",
         source=str(manifest_path),
-        output=str(output_path),
         run_id=run_id,
         num_rounds=num_rounds,
         num_clients=num_clients,
         is_iid=is_iid,
-        data_seed=data_seed
+        data_seed=data_seed,
+        namespace=namespace
     )
+    return manifest
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 30) -> float:
+    """Exponential poll interval: fast first retries, capped for long waits"""
+    return min(base * 1.5 ** attempt, cap)
 
 
 def wait_for_server_ready(namespace: str, run_id: str, timeout: int = 300):
-    """Wait for FL server pod to be Running"""
+    """
+    Wait for FL server pod to be Ready
+    
+    kubectl rollout status watches the Deployment, which exists as soon as the
+    manifest is applied, so there is no retry loop while its pod is created.
+    """
     log_event("wait_server_start", namespace=namespace, run_id=run_id, timeout_sec=timeout)
     start = time.time()
     
-    while time.time() - start < timeout:
-        result = run_command([
-            "kubectl", "get", "pods",
-            "-n", namespace,
-            "-l", f"run-id={run_id},app=fl-server",
-            "-o", "jsonpath={.items[0].status.phase}"
-        ], check=False)
-        
-        phase = result.stdout.strip()
-        if phase == "Running":
-            log_event("wait_server_ready", namespace=namespace, run_id=run_id, duration_sec=time.time() - start)
-            return True
-        
-        time.sleep(2)
+    result = run_command([
+        "kubectl", "rollout", "status",
+        f"deployment/fl-server-{run_id}",
+        "-n", namespace,
+        f"--timeout={timeout}s"
+    ], check=False)
+    
+    if result.returncode == 0:
+        log_event("wait_server_ready", namespace=namespace, run_id=run_id, duration_sec=time.time() - start)
+        return True
     
     log_event("wait_server_timeout", namespace=namespace, run_id=run_id, timeout_sec=timeout)
     return False
 
 
+# Server log line marking the end of training
+EXPERIMENT_END = b'"event": "experiment_end"'
+
+
 def wait_for_completion(namespace: str, run_id: str, timeout: int = 3600):
-    """Wait for experiment completion by monitoring server logs"""
+    """Wait for experiment completion by following the server logs"""
     log_event("wait_completion_start", namespace=namespace, run_id=run_id, timeout_sec=timeout)
     start = time.time()
+    deadline = start + timeout
+    attempt = 0
     
-    # Wait for server pod to exist
-    time.sleep(5)
-    
-    while time.time() - start < timeout:
-        # Get server pod name
-        result = run_command([
-            "kubectl", "get", "pods",
-            "-n", namespace,
-            "-l", f"run-id={run_id},app=fl-server",
-            "-o", "jsonpath={.items[0].metadata.name}"
-        ], check=False)
-        
-        if result.returncode != 0 or not result.stdout.strip():
-            log_event("wait_server_pod", namespace=namespace, run_id=run_id, status="not_found")
-            time.sleep(5)
-            continue
-        
-        server_pod = result.stdout.strip()
+    while time.time() < deadline:
+        remaining = max(int(deadline - time.time()), 1)
         
-        # Check server logs for experiment_end event
-        result = run_command([
-            "kubectl", "logs",
-            "-n", namespace,
-            server_pod
-        ], check=False)
-        
-        if result.returncode == 0 and '"event": "experiment_end"' in result.stdout:
-            duration = time.time() - start
-            log_event("wait_completion_success", namespace=namespace, run_id=run_id, duration_sec=duration)
-            return True
+        # Follow the server log through its Deployment: kubectl itself waits for
+        # the pod to start, and the whole wait is one long-lived stream with no
+        # pod lookups. Lines are pushed as they are written, so the
+        # experiment_end event is seen immediately without re-fetching the log
+        proc = subprocess.Popen(
+            spawn_argv(["kubectl", "logs", "-f", "-n", namespace, f"deployment/fl-server-{run_id}",
+                        f"--pod-running-timeout={remaining}s"]),
+            close_fds=False,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+        # Killing the process ends the stdout iteration below on timeout
+        timer = threading.Timer(remaining, proc.kill)
+        timer.start()
+        try:
+            # Raw bytes: the sentinel search needs no UTF-8 decode per line
+            for line in proc.stdout:
+                if EXPERIMENT_END in line:
+                    duration = time.time() - start
+                    log_event("wait_completion_success", namespace=namespace, run_id=run_id, duration_sec=duration)
+                    return True
+        finally:
+            timer.cancel()
+            proc.kill()
+            proc.wait()
         
-        # Check if pod failed
-        result = run_command([
-            "kubectl", "get", "pod",
-            "-n", namespace,
-            server_pod,
-            "-o", "jsonpath={.status.phase}"
-        ], check=False)
+        # Stream ended without experiment_end: check if pod failed, else reattach
+        selector = f"run-id={run_id},app=fl-server"
+        data = api_get(f"/api/v1/namespaces/{namespace}/pods", labelSelector=selector)
+        # Name and phase come from the same listing, so the failure names its pod
+        if data is not None:
+            pods = [(item["metadata"]["name"], item["status"].get("phase", "Unknown"))
+                    for item in data["items"]]
+        else:
+            output = run_command([
+                "kubectl", "get", "pods",
+                "-n", namespace,
+                "-l", selector,
+                "-o", "jsonpath={range .items[*]}{.metadata.name}{\"\\t\"}{.status.phase}{\"\\n\"}{end}"
+            ], check=False, quiet=True).stdout
+            pods = [tuple(line.split("\t", 1)) for line in output.splitlines() if "\t" in line]
         
-        if result.returncode == 0:
-            phase = result.stdout.strip()
-            if phase in ["Failed", "Error", "Unknown"]:
-                log_event("wait_completion_failed", namespace=namespace, run_id=run_id, pod_phase=phase)
-                return False
+        if not pods:
+            log_event("wait_server_pod", namespace=namespace, run_id=run_id, status="not_found")
+        elif pods[0][1] in ["Failed", "Error", "Unknown"]:
+            log_event("wait_completion_failed", namespace=namespace, run_id=run_id,
+                      pod=pods[0][0], pod_phase=pods[0][1])
+            return False
         
-        time.sleep(10)
+        time.sleep(backoff_delay(attempt))
+        attempt += 1
     
     log_event("wait_completion_timeout", namespace=namespace, run_id=run_id, timeout_sec=timeout)
     return False
 
 
+# Buffer size for demultiplexed log streams
+LOG_BUFFER_SIZE = 1 << 20
+
+
+def fetch_pod_log(namespace: str, pod: str, log_file: Path):
+    """
+    Write a pod's log straight to disk
+    
+    kubectl inherits the file descriptor as its stdout, so the log bytes go
+    from the child to the file without passing through Python; the file is
+    opened unbuffered in binary mode since Python never writes to it.
+    """
+    with open(log_file, 'wb', buffering=0) as f:
+        subprocess.run(
+            spawn_argv(["kubectl", "logs", "-n", namespace, pod]),
+            close_fds=False,
+            stdout=f,
+            stderr=subprocess.STDOUT,
+            check=False
+        )
+
+
+def fetch_client_logs_multiplexed(namespace: str, run_id: str, client_pods: list, output_dir: Path) -> bool:
+    """
+    Fetch every client pod's log through a single `kubectl logs -l ... --prefix`
+    
+    kubectl streams all pods concurrently over one API connection instead of
+    paying a process start and TLS handshake per pod. Each line carries a
+    "[pod/<name>/<container>] " prefix, which routes it to that pod's file.
+    Returns False if kubectl failed, so the caller can fetch pod by pod.
+    """
+    # Lines arrive a few dozen bytes at a time; 1 MiB buffers on the pipe and
+    # on each file turn them into a handful of large read/write syscalls
+    files = {pod: open(output_dir / f"{pod}_{run_id}.log", 'wb', buffering=LOG_BUFFER_SIZE)
+             for pod in client_pods}
+    try:
+        proc = subprocess.Popen(
+            spawn_argv(["kubectl", "logs", "-n", namespace,
+                        "-l", f"run-id={run_id},app=fl-client",
+                        "--prefix", "--tail=-1", f"--max-log-requests={len(client_pods)}"]),
+            close_fds=False,
+            bufsize=LOG_BUFFER_SIZE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+        with proc:
+            for line in proc.stdout:
+                prefix_end = line.find(b"] ")
+                if line.startswith(b"[pod/") and prefix_end != -1:
+                    pod = line[len(b"[pod/"):prefix_end].split(b"/", 1)[0].decode()
+                    if pod in files:
+                        files[pod].write(line[prefix_end + 2:])
+    finally:
+        for f in files.values():
+            f.close()
+    
+    if proc.returncode != 0:
+        return False
+    
+    for pod in client_pods:
+        log_event("logs_collected_client", pod=pod, file=str(output_dir / f"{pod}_{run_id}.log"))
+    return True
+
+
 def collect_logs(namespace: str, run_id: str, output_dir: Path):
     """Collect logs from server and all clients for this specific run"""
     log_event("logs_collect_start", namespace=namespace, run_id=run_id)
     
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    # Server logs (filter by run-id)
-    log_event("logs_collect_server", namespace=namespace)
-    result = run_command([
-        "kubectl", "get", "pods",
-        "-n", namespace,
-        "-l", f"run-id={run_id},app=fl-server",
-        "-o", "jsonpath={.items[0].metadata.name}"
-    ], check=False)
+    # One listing for server and client pods (filter by run-id)
+    pods = list_run_pods(namespace, run_id)
     
-    server_pod = result.stdout.strip()
-    if server_pod:
+    client_pods = pods.get("fl-client", [])
+    server_pod = pods.get("fl-server", [None])[0]
+    
+    def fetch_server_log():
         server_log = output_dir / f"server_{run_id}.log"
-        with open(server_log, 'w') as f:
-            subprocess.run(
-                ["kubectl", "logs", "-n", namespace, server_pod],
-                stdout=f,
-                stderr=subprocess.STDOUT,
-                check=False
-            )
+        fetch_pod_log(namespace, server_pod, server_log)
         log_event("logs_collected_server", file=str(server_log))
     
-    # Client logs (filter by run-id)
-    result = run_command([
-        "kubectl", "get", "pods",
-        "-n", namespace,
-        "-l", f"run-id={run_id},app=fl-client",
-        "-o", "jsonpath={.items[*].metadata.name}"
-    ], check=False)
-    
-    client_pods = result.stdout.strip().split()
-    for pod in client_pods:
-        if not pod:  # Skip empty strings
-            continue
+    def fetch_client_log(pod):
         client_log = output_dir / f"{pod}_{run_id}.log"
-        with open(client_log, 'w') as f:
-            subprocess.run(
-                ["kubectl", "logs", "-n", namespace, pod],
-                stdout=f,
-                stderr=subprocess.STDOUT,
-                check=False
-            )
+        fetch_pod_log(namespace, pod, client_log)
         log_event("logs_collected_client", pod=pod, file=str(client_log))
     
+    # Every fetch is independent and I/O-bound: the server log downloads in
+    # the background while the clients' logs come through one multiplexed
+    # kubectl call (falling back to concurrent per-pod fetches if it fails)
+    with ThreadPoolExecutor(max_workers=min(32, len(client_pods) + 1)) as executor:
+        log_event("logs_collect_server", namespace=namespace)
+        if server_pod:
+            executor.submit(fetch_server_log)
+        
+        if client_pods and not fetch_client_logs_multiplexed(namespace, run_id, client_pods, output_dir):
+            list(executor.map(fetch_client_log, client_pods))
+    
     log_event("logs_collect_end", namespace=namespace, output_dir=str(output_dir))
 
 
+# Host identity for meta.json; invariant for the life of the process
+_UNAME = os.uname() if hasattr(os, 'uname') else None
+
+
+@functools.lru_cache(maxsize=1)
+def git_commit_hash(repo_root: Path = Path(__file__).resolve().parent.parent) -> str:
+    """
+    Commit hash of HEAD, read straight from .git (no `git` subprocess)
+    
+    Follows a symbolic ref through the loose ref file, then packed-refs.
+    """
+    try:
+        git_dir = repo_root / ".git"
+        if git_dir.is_file():  # worktree/submodule: "gitdir: <path>"
+            git_dir = (repo_root / git_dir.read_text().split(":", 1)[1].strip()).resolve()
+        
+        head = (git_dir / "HEAD").read_text().strip()
+        if not head.startswith("ref: "):
+            return head  # detached HEAD
+        
+        ref = head[len("ref: "):]
+        # Worktrees keep HEAD locally but share refs with the main repo
+        common_file = git_dir / "commondir"
+        common_dir = (git_dir / common_file.read_text().strip()).resolve() if common_file.exists() else git_dir
+        
+        ref_file = common_dir / ref
+        if ref_file.exists():
+            return ref_file.read_text().strip()
+        
+        packed = common_dir / "packed-refs"
+        if packed.exists():
+            for line in packed.read_text().splitlines():
+                if line.endswith(f" {ref}"):
+                    return line.split(" ", 1)[0]
+    except OSError:
+        pass
+    return "unknown"
+
+
 def save_metadata(output_dir: Path, run_id: str, config: dict):
     """Save run metadata to meta.json"""
-    import subprocess
-    
     # Get git commit hash
-    try:
-        commit_hash = subprocess.run(
-            ["git", "rev-parse", "HEAD"],
-            capture_output=True,
-            text=True,
-            check=False
-        ).stdout.strip()
-    except:
-        commit_hash = "unknown"
+    commit_hash = git_commit_hash()
     
     # Get versions
     metadata = {
@@ -360,8 +727,8 @@ def save_metadata(output_dir: Path, run_id: str, config: dict):
             "kubernetes": "minikube"
         },
         "environment": {
-            "os": os.uname().sysname if hasattr(os, 'uname') else "unknown",
-            "hostname": os.uname().nodename if hasattr(os, 'uname') else "unknown"
+            "os": _UNAME.sysname if _UNAME else "unknown",
+            "hostname": _UNAME.nodename if _UNAME else "unknown"
         }
     }
     
@@ -372,33 +739,36 @@ def save_metadata(output_dir: Path, run_id: str, config: dict):
     log_event("metadata_saved", file=str(meta_file))
 
 
-def cleanup(namespace: str, run_id: str):
-    """Delete resources for this specific run (by run-id), keep namespace"""
-    log_event("cleanup_start", namespace=namespace, run_id=run_id)
+def cleanup(namespace: str, run_id: str, wait: bool = True, reset_network: bool = False):
+    """
+    Delete resources for this specific run (by run-id), keep namespace
+    
+    With wait=False kubectl returns once the deletion is accepted and the
+    pods terminate in the background. Everything is selected by run-id, so
+    the next run of a sweep can start while they do. reset_network=True
+    also removes the node-wide netem left by a shaped run.
+    """
+    log_event("cleanup_start", namespace=namespace, run_id=run_id, wait=wait)
     
-    # Delete only resources with this run-id
-    run_command(
-        ["kubectl", "delete", "jobs,deployments,services", 
-         "-n", namespace, "-l", f"run-id={run_id}"],
-        check=False
+    # Delete only resources with this run-id; pods are in the selector so
+    # orphans go too, and --wait blocks (on a watch, no re-listing) until they
+    # have fully terminated
+    result = run_command(
+        ["kubectl", "delete", "jobs,deployments,services,pods",
+         "-n", namespace, "-l", f"run-id={run_id}",
+         "--cascade=foreground", f"--wait={str(wait).lower()}", "--timeout=60s"],
+        check=False,
+        decode=False
     )
     
-    # Wait for pods to fully terminate
-    import time
-    max_wait = 60
-    start = time.time()
-    while time.time() - start < max_wait:
-        result = run_command(
-            ["kubectl", "get", "pods", "-n", namespace, 
-             "-l", f"run-id={run_id}",
-             "-o", "jsonpath={.items[*].metadata.name}"],
-            check=False
-        )
-        if not result.stdout.strip():
-            break
-        time.sleep(3)
+    # With --wait a zero exit status means every pod is gone, so the old
+    # "pods remaining?" poll is not needed to tell a clean teardown from a timeout
+    
+    if reset_network:
+        reset_netem()
     
-    log_event("cleanup_end", namespace=namespace, run_id=run_id)
+    log_event("cleanup_end", namespace=namespace, run_id=run_id,
+              terminated=(result.returncode == 0) if wait else None)
 
 
 def collect_debug_info(namespace: str, run_id: str, output_dir: Path):
@@ -409,15 +779,27 @@ def collect_debug_info(namespace: str, run_id: str, output_dir: Path):
         with open(debug_file, 'w') as f:
             f.write(f"=== DEBUG INFO FOR {run_id} ===\n\n")
             
+            # Pod and Job listings are scoped to this run's label, so pods left
+            # terminating by earlier runs of a sweep are neither fetched nor shown
+            selector = f"run-id={run_id}"
+            
             # Pod status
             f.write("=== POD STATUS ===\n")
-            result = run_command(["kubectl", "get", "pods", "-n", namespace, "-o", "wide"], check=False)
+            result = run_command(["kubectl", "get", "pods", "-n", namespace, "-l", selector, "-o", "wide"],
+                                 check=False)
             f.write(result.stdout + "\n\n")
             
             # Jobs status  
             f.write("=== JOBS STATUS ===\n")
-            result = run_command(["kubectl", "get", "jobs", "-n", namespace, "-o", "yaml"], check=False)
-            f.write(result.stdout[:2000] + "\n\n")  # Limit output
+            # Only the fields needed to see which clients failed and why,
+            # rather than the full YAML of every Job (truncated anyway)
+            f.write("NAME\tSUCCEEDED\tFAILED\tREASON\n")
+            result = run_command([
+                "kubectl", "get", "jobs", "-n", namespace, "-l", selector,
+                "-o", "jsonpath={range .items[*]}{.metadata.name}{\"\\t\"}{.status.succeeded}{\"\\t\"}"
+                      "{.status.failed}{\"\\t\"}{.status.conditions[*].reason}{\"\\n\"}{end}"
+            ], check=False)
+            f.write(result.stdout + "\n")
             
             # Recent events
             f.write("=== RECENT EVENTS ===\n")
@@ -425,8 +807,11 @@ def collect_debug_info(namespace: str, run_id: str, output_dir: Path):
                 "kubectl", "get", "events", "-n", namespace, 
                 "--sort-by=.lastTimestamp"
             ], check=False)
-            lines = result.stdout.split('\n')
-            f.write('\n'.join(lines[-30:]) + "\n")  # Last 30 events
+            # Events carry no labels; every object of a run has the run-id in
+            # its name, so keep the header plus this run's last 30 events
+            lines = result.stdout.splitlines()
+            run_lines = [line for line in lines[1:] if run_id in line]
+            f.write('\n'.join(lines[:1] + run_lines[-30:]) + "\n")
         
         log_event("debug_collected", file=str(debug_file))
     except Exception as e:
@@ -441,7 +826,7 @@ def main():
     parser.add_argument(
         "--sec-level",
         required=True,
-        choices=["SEC0", "SEC1", "SEC2", "SEC3"],
+        choices=list(MANIFEST_DIRS),
         help="Security configuration"
     )
     parser.add_argument(
@@ -486,6 +871,28 @@ def main():
         default=Path("results/logs"),
         help="Output directory for logs"
     )
+    parser.add_argument(
+        "--namespace",
+        default="fl-experiment",
+        help="Kubernetes namespace to run in"
+    )
+    parser.add_argument(
+        "--background-cleanup",
+        action="store_true",
+        help="Return once resource deletion is accepted instead of waiting for pods to terminate"
+    )
+    parser.add_argument(
+        "--run-id",
+        default=None,
+        help="Use this RUN_ID instead of generating one (lowercase letters, digits and hyphens; "
+             "e.g. so a matrix runner can record it)"
+    )
+    parser.add_argument(
+        "--keep-netem",
+        action="store_true",
+        help="Network profile is applied and reset by the caller (e.g. a parallel batch sharing it); "
+             "leave node netem untouched"
+    )
     parser.add_argument(
         "--keep-namespace",
         action="store_true",
@@ -494,8 +901,25 @@ def main():
     
     args = parser.parse_args()
     
-    # Generate unique RUN_ID (Kubernetes DNS compliant: lowercase, hyphens only)
-    run_id = f"{args.sec_level.lower()}-{args.net_profile.lower()}-{int(time.time())}"
+    # The id goes into resource names such as fl-client-10-<RUN_ID>, which
+    # must stay valid DNS labels (<= 63 characters)
+    if args.run_id is not None and not RUN_ID_PATTERN.fullmatch(args.run_id):
+        parser.error(f"--run-id must match {RUN_ID_PATTERN.pattern}: {args.run_id!r}")
+    
+    # Buffer log lines even on a terminal (flushed at FLUSH_EVENTS and on exit)
+    sys.stdout.reconfigure(line_buffering=False)
+    
+    # Share one kubectl discovery/HTTP cache across every kubectl call (and
+    # every run_one invocation) so only the first one pays for API discovery
+    kube_cache = os.environ.setdefault("KUBECACHEDIR", "/tmp/kubecache")
+    os.makedirs(kube_cache, exist_ok=True)
+    
+    # One authenticated API session for pod queries (falls back to kubectl)
+    start_api_proxy()
+    
+    # Generate unique RUN_ID (Kubernetes DNS compliant: lowercase, hyphens only);
+    # the random suffix keeps parallel matrix workers from colliding
+    run_id = args.run_id or f"{args.sec_level.lower()}-{args.net_profile.lower()}-{int(time.time())}-{uuid.uuid4().hex[:6]}"
     
     log_event(
         "experiment_start",
@@ -506,66 +930,67 @@ def main():
         num_rounds=args.num_rounds
     )
     
+    # A shaped run leaves node-wide netem behind; remove it on the way out
+    # (unless the caller owns the node's netem)
+    reset_network = args.net_profile != "NET0" and not args.keep_netem
+    
     try:
         # Determine manifest path based on SEC level
-        if args.sec_level == "SEC0":
-            manifest_dir = Path("k8s/00-baseline")
-        elif args.sec_level == "SEC1":
-            manifest_dir = Path("k8s/10-networkpolicy")
-        elif args.sec_level == "SEC2":
-            manifest_dir = Path("k8s/20-mtls")
-        else:  # SEC3
-            manifest_dir = Path("k8s/25-combined")
-        
-        manifest_path = manifest_dir / "fl-deployment.yaml"
+        manifest_path = MANIFEST_DIRS[args.sec_level] / "fl-deployment.yaml"
         
         if not manifest_path.exists():
             log_event("manifest_not_found", path=str(manifest_path))
             sys.exit(1)
         
-        # Create temporary manifest with RUN_ID and parameters injected
-        temp_manifest = Path(f"/tmp/fl-deployment-{run_id}.yaml")
-        inject_run_id(
+        # Render manifest with RUN_ID and parameters injected
+        manifest = inject_run_id(
             manifest_path, 
             run_id, 
-            temp_manifest,
             num_rounds=args.num_rounds,
             num_clients=args.num_clients,
             is_iid=args.iid,
-            data_seed=args.data_seed
+            data_seed=args.data_seed,
+            namespace=args.namespace
         )
         
-        # Apply manifest
-        log_event("apply_manifest", manifest=str(temp_manifest))
-        run_command(["kubectl", "apply", "-f", str(temp_manifest)])
+        # Apply manifest (piped on stdin, no temp file)
+        log_event("apply_manifest", manifest=str(manifest_path))
+        # Server-side apply: the API server does the merge, so kubectl returns as
+        # soon as the objects are accepted and the readiness watch starts sooner
+        run_command([
+            "kubectl", "apply", "--server-side", "--field-manager=run_one",
+            "--force-conflicts", "-f", "-"
+        ], input=manifest.encode(), decode=False)
         
         # Wait for server to be ready
-        if not wait_for_server_ready("fl-experiment", run_id, timeout=300):
+        if not wait_for_server_ready(args.namespace, run_id, timeout=300):
             log_event("experiment_failed", reason="server_not_ready")
-            cleanup("fl-experiment", run_id)
+            cleanup(args.namespace, run_id, wait=not args.background_cleanup, reset_network=reset_network)
             sys.exit(1)
         
         # Apply network profile (after server ready, before completion check)
-        time.sleep(10)  # Let clients spawn
-        apply_network_profile(args.net_profile, "fl-experiment", run_id)
+        if args.keep_netem:
+            log_event("network_profile_skip", profile=args.net_profile, reason="managed_by_caller")
+        else:
+            apply_network_profile(args.net_profile, args.namespace, run_id, args.num_clients)
         
         # Wait for completion with dynamic timeout based on network profile
         timeout = 7200 if args.net_profile == "NET2" else 3600  # 2h for NET2, 1h for others
-        if not wait_for_completion("fl-experiment", run_id, timeout=timeout):
+        if not wait_for_completion(args.namespace, run_id, timeout=timeout):
             log_event("experiment_failed", reason="completion_timeout", timeout_sec=timeout)
             
             # Collect debug info before cleanup
             debug_dir = args.output_dir / run_id
             debug_dir.mkdir(parents=True, exist_ok=True)
-            collect_debug_info("fl-experiment", run_id, debug_dir)
+            collect_debug_info(args.namespace, run_id, debug_dir)
             
-            collect_logs("fl-experiment", run_id, args.output_dir)
-            cleanup("fl-experiment", run_id)
+            collect_logs(args.namespace, run_id, args.output_dir)
+            cleanup(args.namespace, run_id, wait=not args.background_cleanup, reset_network=reset_network)
             sys.exit(1)
         
         # Collect logs
         output_dir_run = args.output_dir / run_id
-        collect_logs("fl-experiment", run_id, output_dir_run)
+        collect_logs(args.namespace, run_id, output_dir_run)
         
         # Save metadata
         config_dict = {
@@ -580,7 +1005,7 @@ def main():
         save_metadata(output_dir_run, run_id, config_dict)
         
         # Cleanup
-        cleanup("fl-experiment", run_id)
+        cleanup(args.namespace, run_id, wait=not args.background_cleanup, reset_network=reset_network)
         
         log_event("experiment_success", run_id=run_id)
         
@@ -591,27 +1016,12 @@ def main():
         try:
             debug_dir = args.output_dir / run_id
             debug_dir.mkdir(parents=True, exist_ok=True)
-            collect_debug_info("fl-experiment", run_id, debug_dir)
+            collect_debug_info(args.namespace, run_id, debug_dir)
         except:
             pass
         
-        # Clean up temp file before calling cleanup
-        try:
-            temp_manifest = Path(f"/tmp/fl-deployment-{run_id}.yaml")
-            if temp_manifest.exists():
-                temp_manifest.unlink()
-        except:
-            pass
-        cleanup("fl-experiment", run_id)
+        cleanup(args.namespace, run_id, wait=not args.background_cleanup, reset_network=reset_network)
         sys.exit(1)
-    finally:
-        # Remove temp manifest (if still exists)
-        try:
-            temp_manifest = Path(f"/tmp/fl-deployment-{run_id}.yaml")
-            if temp_manifest.exists():
-                temp_manifest.unlink()
-        except:
-            pass
 
 
 if __name__ == "__main__":
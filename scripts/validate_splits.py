@@ -15,7 +15,44 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from fl_client import create_iid_split, create_noniid_split
-from torchvision import datasets, transforms
+from torchvision import datasets
+
+MNIST_ROOT = "/tmp/mnist"
+
+
+def load_mnist_labels() -> np.ndarray:
+    """Read the MNIST training labels straight from the raw idx file"""
+    label_file = Path(MNIST_ROOT) / "MNIST" / "raw" / "train-labels-idx1-ubyte"
+    if not label_file.exists():
+        datasets.MNIST(MNIST_ROOT, train=True, download=True)
+    
+    data = label_file.read_bytes()
+    magic, count = int.from_bytes(data[0:4], "big"), int.from_bytes(data[4:8], "big")
+    if magic != 2049 or len(data) != 8 + count:
+        raise ValueError(f"Not an MNIST idx1 label file: {label_file}")
+    return np.frombuffer(data, dtype=np.uint8, offset=8)
+
+
+def check_coverage(parts: list, dataset_size: int) -> bool:
+    """Check that the per-client index arrays cover the dataset exactly once"""
+    all_indices = np.concatenate(parts) if parts else np.empty(0, dtype=np.int32)
+    num_unique = np.unique(all_indices).size
+    
+    print(f"\nValidation Results:")
+    print(f"  Total indices collected: {all_indices.size}")
+    print(f"  Unique indices: {num_unique}")
+    print(f"  Expected (dataset size): {dataset_size}")
+    
+    if all_indices.size != num_unique:
+        print(f"  ❌ FAIL: Found {all_indices.size - num_unique} duplicate indices!")
+        return False
+    
+    if num_unique != dataset_size:
+        print(f"  ❌ FAIL: Missing {dataset_size - num_unique} samples!")
+        return False
+    
+    print(f"  ✅ PASS: No duplicates, all samples assigned")
+    return True
 
 
 def validate_iid_split(num_clients: int, data_seed: int):
@@ -25,20 +62,8 @@ def validate_iid_split(num_clients: int, data_seed: int):
     print(f"  Clients: {num_clients}, Data Seed: {data_seed}")
     print(f"{'='*60}")
     
-    # Load dataset to get size
-    transform = transforms.Compose([
-        transforms.ToTensor(),
-        transforms.Normalize((0.1307,), (0.3081,))
-    ])
-    
-    trainset = datasets.MNIST(
-        "/tmp/mnist",
-        train=True,
-        download=True,
-        transform=transform
-    )
-    
-    dataset_size = len(trainset)
+    # Only the dataset size is needed
+    dataset_size = load_mnist_labels().size
     print(f"Dataset size: {dataset_size}")
     
     # Get splits for all clients
@@ -47,32 +72,13 @@ def validate_iid_split(num_clients: int, data_seed: int):
     
     for client_id in range(num_clients):
         indices = create_iid_split(dataset_size, num_clients, client_id, data_seed)
-        all_indices.extend(indices)
+        all_indices.append(np.asarray(indices, dtype=np.int32))
         client_sizes.append(len(indices))
         print(f"  Client {client_id}: {len(indices)} samples")
     
-    # Check for duplicates
-    unique_indices = set(all_indices)
-    
-    print(f"\nValidation Results:")
-    print(f"  Total indices collected: {len(all_indices)}")
-    print(f"  Unique indices: {len(unique_indices)}")
-    print(f"  Expected (dataset size): {dataset_size}")
-    
-    # Assertions
-    has_duplicates = len(all_indices) != len(unique_indices)
-    missing_samples = len(unique_indices) != dataset_size
-    
-    if has_duplicates:
-        print(f"  ❌ FAIL: Found {len(all_indices) - len(unique_indices)} duplicate indices!")
+    if not check_coverage(all_indices, dataset_size):
         return False
     
-    if missing_samples:
-        print(f"  ❌ FAIL: Missing {dataset_size - len(unique_indices)} samples!")
-        return False
-    
-    print(f"  ✅ PASS: No duplicates, all samples assigned")
-    
     # Check balance
     sizes = np.array(client_sizes)
     mean_size = sizes.mean()
@@ -92,80 +98,49 @@ def validate_noniid_split(num_clients: int, alpha: float, data_seed: int):
     print(f"  Clients: {num_clients}, Alpha: {alpha}, Data Seed: {data_seed}")
     print(f"{'='*60}")
     
-    # Load dataset to get labels
-    transform = transforms.Compose([
-        transforms.ToTensor(),
-        transforms.Normalize((0.1307,), (0.3081,))
-    ])
-    
-    trainset = datasets.MNIST(
-        "/tmp/mnist",
-        train=True,
-        download=True,
-        transform=transform
-    )
-    
-    labels = trainset.targets.numpy()
-    dataset_size = len(labels)
+    # Load labels only (no image decoding)
+    labels = load_mnist_labels()
+    dataset_size = labels.size
     print(f"Dataset size: {dataset_size}")
     
     # Get splits for all clients
     all_indices = []
     client_sizes = []
-    client_label_dist = []
     
     for client_id in range(num_clients):
         indices = create_noniid_split(labels, num_clients, client_id, alpha, data_seed)
-        all_indices.extend(indices)
+        all_indices.append(np.asarray(indices, dtype=np.int32))
         client_sizes.append(len(indices))
-        
-        # Count label distribution
-        client_labels = labels[indices]
-        label_counts = np.bincount(client_labels, minlength=10)
-        client_label_dist.append(label_counts)
-        
-        print(f"  Client {client_id}: {len(indices)} samples")
-        print(f"    Label distribution: {label_counts}")
     
-    # Check for duplicates
-    unique_indices = set(all_indices)
+    # Count label distribution of every client in one bincount over
+    # (client_id, label) keys; exact even if the split has duplicates
+    client_of = np.repeat(np.arange(num_clients, dtype=np.int64), client_sizes)
+    keys = client_of * 10 + labels[np.concatenate(all_indices)]
+    label_dist = np.bincount(keys, minlength=num_clients * 10).reshape(num_clients, 10)
     
-    print(f"\nValidation Results:")
-    print(f"  Total indices collected: {len(all_indices)}")
-    print(f"  Unique indices: {len(unique_indices)}")
-    print(f"  Expected (dataset size): {dataset_size}")
-    
-    # Assertions
-    has_duplicates = len(all_indices) != len(unique_indices)
-    missing_samples = len(unique_indices) != dataset_size
-    
-    if has_duplicates:
-        print(f"  ❌ FAIL: Found {len(all_indices) - len(unique_indices)} duplicate indices!")
-        return False
+    for client_id, label_counts in enumerate(label_dist):
+        print(f"  Client {client_id}: {client_sizes[client_id]} samples")
+        print(f"    Label distribution: {label_counts}")
     
-    if missing_samples:
-        print(f"  ❌ FAIL: Missing {dataset_size - len(unique_indices)} samples!")
+    if not check_coverage(all_indices, dataset_size):
         return False
     
-    print(f"  ✅ PASS: No duplicates, all samples assigned")
-    
     # Check skewness
-    label_dist = np.array(client_label_dist)
     print(f"\nSkewness Analysis:")
     print(f"  Alpha (lower = more skewed): {alpha}")
     
-    # Jensen-Shannon divergence from uniform
-    uniform = np.ones(10) / 10
-    divergences = []
-    for i, dist in enumerate(label_dist):
-        if dist.sum() > 0:
-            p = dist / dist.sum()
-            # Simple KL-like metric
-            nonzero = p > 0
-            kl = (p[nonzero] * np.log(p[nonzero] / uniform[nonzero])).sum()
-            divergences.append(kl)
-            print(f"  Client {i} KL-divergence: {kl:.3f}")
+    # KL divergence from uniform for all clients at once: with u = 1/10,
+    # log(p / u) = log(10 p); empty bins contribute 0 and empty clients are skipped
+    sums = label_dist.sum(axis=1, keepdims=True)
+    p = np.divide(label_dist, sums, out=np.zeros(label_dist.shape), where=sums > 0)
+    log_ratio = np.log(p * 10.0, out=np.zeros_like(p), where=p > 0)
+    kl = (p * log_ratio).sum(axis=1)
+    
+    nonempty = sums[:, 0] > 0
+    for i in np.flatnonzero(nonempty):
+        print(f"  Client {i} KL-divergence: {kl[i]:.3f}")
     
+    divergences = kl[nonempty]
     avg_divergence = np.mean(divergences)
     print(f"  Average KL-divergence: {avg_divergence:.3f}")
     print(f"  (Higher = more skewed. Baseline uniform = 0.0)")
@@ -8,18 +8,23 @@ CRITICAL FIXES:
 3. Proper IID and Non-IID split functions
 """
 
+import contextlib
+import functools
+import hashlib
+import tempfile
 import time
 import json
 import logging
 import os
+from pathlib import Path
 from typing import Tuple, Dict
 
 import flwr as fl
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
-from torch.utils.data import DataLoader, Subset
-from torchvision import datasets, transforms
+from torch.utils.data import TensorDataset
+from torchvision import datasets
 import numpy as np
 
 # Configure structured JSON logging
@@ -29,6 +34,29 @@ logging.basicConfig(
 )
 logger = logging.getLogger("fl_client")
 
+# Bound encode of a default encoder, shared by every log_event call
+_encode_json = json.JSONEncoder().encode
+
+
+def log_event(event: str, **fields):
+    """Log a structured JSON event; timestamp defaults to now"""
+    fields.setdefault("timestamp", time.time())
+    logger.info(_encode_json({"event": event, **fields}))
+
+
+# Floating-point parameters are sent to the server as fp16 to halve the
+# bytes serialized and transferred each round; training itself stays FP32/AMP
+TRANSPORT_DTYPE = torch.float16
+
+
+def transport_dtype(t: torch.Tensor) -> torch.dtype:
+    """Wire dtype for a parameter tensor"""
+    return TRANSPORT_DTYPE if t.is_floating_point() else t.dtype
+
+
+# Batch shapes are fixed, so let cuDNN benchmark and keep the fastest conv kernels
+torch.backends.cudnn.benchmark = True
+
 
 class SimpleCNN(nn.Module):
     """Simple CNN for MNIST"""
@@ -112,7 +140,14 @@ def create_noniid_split(
     Returns:
         Indices for this client
     """
-    num_classes = len(np.unique(labels))
+    # One stable argsort groups the indices by class, each class in ascending
+    # order as np.where would return them; class c is order[starts[c]:starts[c + 1]]
+    order = np.argsort(labels, kind="stable")
+    sorted_labels = labels[order]
+    # Same as len(np.unique(labels)), without a second sort
+    num_classes = int(np.count_nonzero(sorted_labels[1:] != sorted_labels[:-1])) + 1
+    starts = np.searchsorted(sorted_labels, np.arange(num_classes + 1))
+    counts = np.diff(starts)
     
     # FIX: Use SHARED seed (critical!)
     rng = np.random.RandomState(data_seed)
@@ -120,24 +155,83 @@ def create_noniid_split(
     # Create Dirichlet distribution per class (same for all clients)
     label_distribution = rng.dirichlet([alpha] * num_clients, num_classes)
     
-    # Assign samples to clients based on distribution
-    client_indices = []
+    # Split every class's samples according to its Dirichlet proportions
+    bounds = (np.cumsum(label_distribution, axis=1) * counts[:, None]).astype(int)
+    
+    # This client's slice of every class, and the output written in place
+    start_idx = np.zeros(num_classes, dtype=int) if client_id == 0 else bounds[:, client_id - 1]
+    end_idx = bounds[:, client_id]
+    client_indices = np.empty(int((end_idx - start_idx).sum()), dtype=order.dtype)
     
+    # Assign samples to clients based on distribution
+    offset = 0
     for class_id in range(num_classes):
-        class_indices = np.where(labels == class_id)[0]
-        # Shuffle with same seed
+        class_indices = order[starts[class_id]:starts[class_id + 1]]
+        # Shuffle with same seed (every class, to keep the RNG sequence shared)
         rng.shuffle(class_indices)
         
-        # Split this class's samples according to Dirichlet proportions
-        splits = np.cumsum(label_distribution[class_id])
-        splits = (splits * len(class_indices)).astype(int)
-        
-        start_idx = 0 if client_id == 0 else splits[client_id - 1]
-        end_idx = splits[client_id]
-        
-        client_indices.extend(class_indices[start_idx:end_idx])
+        n = end_idx[class_id] - start_idx[class_id]
+        client_indices[offset:offset + n] = class_indices[start_idx[class_id]:end_idx[class_id]]
+        offset += n
     
-    return np.array(client_indices)
+    return client_indices
+
+
+# Computed client splits, keyed by a hash of everything that determines them
+SPLIT_CACHE_DIR = Path("/data/mnist/_splits")
+
+
+def save_split(split_file: Path, indices: np.ndarray):
+    """
+    Store a client split for later runs
+    
+    Written to a temporary file and renamed, so concurrent clients never read
+    a partial file; if the cache is not writable the split is just not saved.
+    """
+    try:
+        split_file.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=split_file.parent, suffix=".tmp", delete=False) as f:
+            np.save(f, indices)
+        os.replace(f.name, split_file)
+    except OSError:
+        pass
+
+
+@functools.lru_cache(maxsize=4)
+def get_mnist(root: str, train: bool) -> datasets.MNIST:
+    """
+    MNIST split without transforms, parsed once per process
+    
+    Clients simulated in one process share the parsed tensors; callers only
+    read .data and .targets.
+    """
+    return datasets.MNIST(root, train=train, download=True)
+
+
+class TensorBatchLoader:
+    """
+    Mini-batches drawn from tensors that already live on the training device
+    
+    Replaces Subset + DataLoader: batches are gathered with an index tensor,
+    so there is no per-sample transform, no collate and no host-to-device copy.
+    """
+    def __init__(self, x: torch.Tensor, y: torch.Tensor, batch_size: int, shuffle: bool):
+        self.dataset = TensorDataset(x, y)
+        self.x = x
+        self.y = y
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+
+    def __len__(self):
+        return (len(self.x) + self.batch_size - 1) // self.batch_size
+
+    def __iter__(self):
+        if self.shuffle:
+            order = torch.randperm(len(self.x), device=self.x.device)
+        else:
+            order = torch.arange(len(self.x), device=self.x.device)
+        for idx in order.split(self.batch_size):
+            yield self.x[idx], self.y[idx]
 
 
 def load_data(
@@ -145,42 +239,42 @@ def load_data(
     num_clients: int, 
     iid: bool = True,
     alpha: float = 0.5,
-    data_seed: int = 42
-) -> Tuple[DataLoader, DataLoader]:
+    data_seed: int = 42,
+    device: torch.device = None
+) -> Tuple[TensorBatchLoader, TensorBatchLoader]:
     """
     Load and partition MNIST data for a specific client
     
     CRITICAL: Uses shared data_seed for deterministic, non-overlapping splits
     
+    The client's training samples and the test set are normalized once and
+    uploaded to the device, where they stay for every round.
+    
     Args:
         client_id: Client identifier (0 to num_clients-1)
         num_clients: Total number of clients
         iid: If True, use IID split; if False, use Non-IID Dirichlet split
         alpha: Dirichlet concentration parameter (lower = more skewed)
         data_seed: Shared seed for deterministic data partitioning
+        device: Device holding the tensors (default: CUDA if available)
     """
-    transform = transforms.Compose([
-        transforms.ToTensor(),
-        transforms.Normalize((0.1307,), (0.3081,))
-    ])
-    
-    # Load full training set
-    trainset = datasets.MNIST(
-        "/data/mnist",
-        train=True,
-        download=True,
-        transform=transform
-    )
+    if device is None:
+        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
     
-    testset = datasets.MNIST(
-        "/data/mnist",
-        train=False,
-        download=True,
-        transform=transform
-    )
+    # Load full training set (raw uint8 images; normalized below)
+    trainset = get_mnist("/data/mnist", train=True)
+    testset = get_mnist("/data/mnist", train=False)
     
+    # The split is a pure function of these values, so it is cached on disk
+    split_file = SPLIT_CACHE_DIR / (hashlib.sha1(
+        f"{len(trainset)}|{num_clients}|{iid}|{None if iid else alpha}|{data_seed}|{client_id}".encode()
+    ).hexdigest()[:16] + ".npy")
+    split_cached = split_file.exists()
+    
+    if split_cached:
+        client_indices = np.load(split_file)
     # FIX: Create data partition with SHARED seed (critical for reproducibility)
-    if iid:
+    elif iid:
         # IID split: uniform random partition with shared seed
         client_indices = create_iid_split(
             len(trainset),
@@ -198,36 +292,78 @@ def load_data(
             data_seed
         )
     
-    # Create client's training subset
-    client_trainset = Subset(trainset, client_indices)
+    if not split_cached:
+        save_split(split_file, client_indices)
+    
+    def to_device(images: torch.Tensor) -> torch.Tensor:
+        # ToTensor() + Normalize((0.1307,), (0.3081,)) folded into one scale
+        # and one shift, x / (255 * std) - mean / std, both in place
+        x = images.to(device=device, dtype=torch.float32)
+        x = x.mul_(1.0 / (255.0 * 0.3081)).sub_(0.1307 / 0.3081).unsqueeze_(1)
+        # NHWC to match the channels_last model on CUDA (see FlowerClient)
+        if device.type == "cuda":
+            x = x.contiguous(memory_format=torch.channels_last)
+        return x
     
+    # Create client's training subset
+    train_idx = torch.as_tensor(client_indices, dtype=torch.long)
+    trainloader = TensorBatchLoader(
+        to_device(trainset.data[train_idx]), trainset.targets[train_idx].to(device),
+        batch_size=32, shuffle=True
+    )
     # Each client gets the same test set (for local validation if needed)
-    trainloader = DataLoader(client_trainset, batch_size=32, shuffle=True)
-    testloader = DataLoader(testset, batch_size=128, shuffle=False)
-    
-    logger.info(json.dumps({
-        "event": "data_loaded",
-        "client_id": client_id,
-        "num_samples": len(client_indices),
-        "iid": iid,
-        "alpha": alpha if not iid else None,
-        "data_seed": data_seed,
-        "timestamp": time.time()
-    }))
+    testloader = TensorBatchLoader(
+        to_device(testset.data), testset.targets.to(device),
+        batch_size=128, shuffle=False
+    )
+    
+    log_event(
+        "data_loaded",
+        client_id=client_id,
+        num_samples=len(client_indices),
+        iid=iid,
+        alpha=alpha if not iid else None,
+        data_seed=data_seed,
+        split_cached=split_cached
+    )
     
     return trainloader, testloader
 
 
+def amp_dtype(device: torch.device):
+    """Autocast dtype for mixed precision: bf16 where supported, else fp16; None on CPU"""
+    if device.type != "cuda":
+        return None
+    return torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+
+
+def autocast(device: torch.device):
+    """Mixed-precision context for the forward pass; a no-op on CPU"""
+    dtype = amp_dtype(device)
+    if dtype is None:
+        return contextlib.nullcontext()
+    return torch.autocast(device_type=device.type, dtype=dtype)
+
+
 def train(
     model: nn.Module,
-    trainloader: DataLoader,
+    trainloader: TensorBatchLoader,
     epochs: int,
     device: torch.device
 ) -> Tuple[int, float]:
-    """Train model for specified epochs"""
+    """
+    Train model for specified epochs
+    
+    On CUDA the forward pass runs under autocast; weights stay FP32 (they are
+    only cast to TRANSPORT_DTYPE when sent for aggregation). fp16 needs loss
+    scaling.
+    """
     # FIX: CrossEntropyLoss expects logits (not log_softmax)
     criterion = nn.CrossEntropyLoss()
-    optimizer = torch.optim.SGD(model.parameters(), lr=0.01, momentum=0.9)
+    # foreach: one multi-tensor update over all parameters instead of a
+    # per-parameter loop
+    optimizer = torch.optim.SGD(model.parameters(), lr=0.01, momentum=0.9, foreach=True)
+    scaler = torch.cuda.amp.GradScaler(enabled=amp_dtype(device) == torch.float16)
     
     model.train()
     total_samples = 0
@@ -235,13 +371,17 @@ def train(
     
     for epoch in range(epochs):
         for batch_idx, (data, target) in enumerate(trainloader):
-            data, target = data.to(device), target.to(device)
+            # No-op for TensorBatchLoader batches, which are already on the
+            # device; other loaders (e.g. test_fl_locally.py) yield CPU batches
+            data, target = data.to(device, non_blocking=True), target.to(device, non_blocking=True)
             
-            optimizer.zero_grad()
-            output = model(data)  # logits
-            loss = criterion(output, target)
-            loss.backward()
-            optimizer.step()
+            optimizer.zero_grad(set_to_none=True)
+            with autocast(device):
+                output = model(data)  # logits
+                loss = criterion(output, target)
+            scaler.scale(loss).backward()
+            scaler.step(optimizer)
+            scaler.update()
             
             total_samples += len(data)
             total_loss += loss.item() * len(data)
@@ -252,7 +392,7 @@ def train(
 
 def test(
     model: nn.Module,
-    testloader: DataLoader,
+    testloader: TensorBatchLoader,
     device: torch.device
 ) -> Tuple[float, float]:
     """Evaluate model on test set"""
@@ -263,9 +403,10 @@ def test(
     
     with torch.no_grad():
         for data, target in testloader:
-            data, target = data.to(device), target.to(device)
-            output = model(data)  # logits
-            test_loss += criterion(output, target).item()
+            data, target = data.to(device, non_blocking=True), target.to(device, non_blocking=True)
+            with autocast(device):
+                output = model(data)  # logits
+            test_loss += criterion(output.float(), target).item()
             pred = output.argmax(dim=1, keepdim=True)
             correct += pred.eq(target.view_as(pred)).sum().item()
     
@@ -275,6 +416,19 @@ def test(
     return test_loss, accuracy
 
 
+def compile_model(model: nn.Module, device: torch.device) -> nn.Module:
+    """
+    torch.compile the model on CUDA GPUs with compute capability >= 7.0
+    
+    mode="reduce-overhead" fuses the small conv/linear/ReLU ops and replays
+    them as CUDA graphs. The compiled wrapper shares the model's parameters;
+    elsewhere the model is returned as is.
+    """
+    if device.type != "cuda" or torch.cuda.get_device_capability(device)[0] < 7:
+        return model
+    return torch.compile(model, mode="reduce-overhead", fullgraph=True)
+
+
 class FlowerClient(fl.client.NumPyClient):
     """Flower client with logging"""
     
@@ -282,8 +436,8 @@ class FlowerClient(fl.client.NumPyClient):
         self,
         client_id: int,
         num_clients: int,
-        trainloader: DataLoader,
-        testloader: DataLoader
+        trainloader: TensorBatchLoader,
+        testloader: TensorBatchLoader
     ):
         self.client_id = client_id
         self.num_clients = num_clients
@@ -292,24 +446,55 @@ class FlowerClient(fl.client.NumPyClient):
         self.model = SimpleCNN()
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         self.model.to(self.device)
+        if self.device.type == "cuda":
+            # NHWC layout lets cuDNN pick its Tensor Core convolution kernels
+            self.model.to(memory_format=torch.channels_last)
+        # Module that train()/test() run; parameters are still read and
+        # written through self.model so state_dict keys keep their names
+        self.net = compile_model(self.model, self.device)
         
-        logger.info(json.dumps({
-            "event": "client_init",
-            "client_id": client_id,
-            "device": str(self.device),
-            "num_train_samples": len(trainloader.dataset),
-            "timestamp": time.time()
-        }))
+        # state_dict() tensors share storage with the live parameters, so
+        # one cached dict is enough to read and write them in place. On CUDA,
+        # get_parameters() copies into reusable pinned host buffers.
+        self._state = self.model.state_dict()
+        self._host_params = None
+        if self.device.type == "cuda":
+            # Contiguous even for channels_last weights: copy_() converts
+            # layout and dtype
+            self._host_params = [torch.empty(t.shape, dtype=transport_dtype(t)).pin_memory()
+                                 for t in self._state.values()]
+        
+        log_event(
+            "client_init",
+            client_id=client_id,
+            device=str(self.device),
+            num_train_samples=len(trainloader.dataset),
+            transport_dtype=str(TRANSPORT_DTYPE)
+        )
     
     def get_parameters(self, config):
-        """Return model parameters as numpy arrays"""
-        return [val.cpu().numpy() for val in self.model.state_dict().values()]
+        """
+        Return model parameters as numpy arrays in the transport dtype
+        
+        On CUDA the arrays are views of the pinned buffers and are only
+        valid until the next call.
+        """
+        if self._host_params is None:
+            return [val.to(transport_dtype(val)).numpy() for val in self._state.values()]
+        
+        # Queue every device-to-host copy, then wait once
+        for buf, val in zip(self._host_params, self._state.values()):
+            buf.copy_(val, non_blocking=True)
+        torch.cuda.current_stream(self.device).synchronize()
+        return [buf.numpy() for buf in self._host_params]
     
     def set_parameters(self, parameters):
-        """Update model parameters from numpy arrays"""
-        params_dict = zip(self.model.state_dict().keys(), parameters)
-        state_dict = {k: torch.tensor(v) for k, v in params_dict}
-        self.model.load_state_dict(state_dict, strict=True)
+        """Update model parameters in place from numpy arrays (any float dtype; copy_ casts)"""
+        if len(parameters) != len(self._state):
+            raise ValueError(f"Expected {len(self._state)} parameter arrays, got {len(parameters)}")
+        with torch.no_grad():
+            for val, array in zip(self._state.values(), parameters):
+                val.copy_(torch.from_numpy(array), non_blocking=True)
     
     def fit(self, parameters, config):
         """Train model and return updated parameters"""
@@ -318,19 +503,19 @@ class FlowerClient(fl.client.NumPyClient):
         # Extract round info from config
         round_id = config.get("server_round", -1)
         
-        logger.info(json.dumps({
-            "event": "fit_start",
-            "client_id": self.client_id,
-            "round_id": round_id,
-            "timestamp": fit_start
-        }))
+        log_event(
+            "fit_start",
+            client_id=self.client_id,
+            round_id=round_id,
+            timestamp=fit_start
+        )
         
         # Update local model
         self.set_parameters(parameters)
         
         # Train
         num_samples, train_loss = train(
-            self.model,
+            self.net,
             self.trainloader,
             epochs=1,
             device=self.device
@@ -338,15 +523,15 @@ class FlowerClient(fl.client.NumPyClient):
         
         fit_end = time.time()
         
-        logger.info(json.dumps({
-            "event": "fit_end",
-            "client_id": self.client_id,
-            "round_id": round_id,
-            "timestamp": fit_end,
-            "duration_sec": fit_end - fit_start,
-            "num_samples": num_samples,
-            "train_loss": train_loss
-        }))
+        log_event(
+            "fit_end",
+            client_id=self.client_id,
+            round_id=round_id,
+            timestamp=fit_end,
+            duration_sec=fit_end - fit_start,
+            num_samples=num_samples,
+            train_loss=train_loss
+        )
         
         # Return updated parameters and metrics
         return (
@@ -358,7 +543,7 @@ class FlowerClient(fl.client.NumPyClient):
     def evaluate(self, parameters, config):
         """Evaluate model (optional, disabled by default)"""
         self.set_parameters(parameters)
-        loss, accuracy = test(self.model, self.testloader, self.device)
+        loss, accuracy = test(self.net, self.testloader, self.device)
         
         return float(loss), len(self.testloader.dataset), {"accuracy": accuracy}
 
@@ -382,15 +567,14 @@ def main():
     torch.manual_seed(train_seed)
     np.random.seed(train_seed)
     
-    logger.info(json.dumps({
-        "event": "client_start",
-        "client_id": args.client_id,
-        "server_address": args.server_address,
-        "data_seed": args.data_seed,
-        "train_seed": train_seed,
-        "run_id": os.getenv("RUN_ID", "unknown"),
-        "timestamp": time.time()
-    }))
+    log_event(
+        "client_start",
+        client_id=args.client_id,
+        server_address=args.server_address,
+        data_seed=args.data_seed,
+        train_seed=train_seed,
+        run_id=os.getenv("RUN_ID", "unknown")
+    )
     
     # Load data with shared data_seed (critical for non-overlapping splits)
     trainloader, testloader = load_data(
@@ -415,11 +599,10 @@ def main():
         client=client
     )
     
-    logger.info(json.dumps({
-        "event": "client_end",
-        "client_id": args.client_id,
-        "timestamp": time.time()
-    }))
+    log_event(
+        "client_end",
+        client_id=args.client_id
+    )
 
 
 if __name__ == "__main__":
@@ -3,20 +3,30 @@ ZeroTrust-FLBench: Federated Learning Server
 Uses Flower framework for FL orchestration with enhanced logging
 """
 
+import atexit
+import contextlib
+import functools
+import hashlib
+import io
 import time
 import json
 import logging
-from typing import List, Tuple, Dict, Optional
+import logging.handlers
+import struct
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple, Optional
 from pathlib import Path
 
 import flwr as fl
-from flwr.common import Metrics, FitRes, Parameters
+from flwr.common import Metrics, FitRes, Parameters, ndarrays_to_parameters
 from flwr.server.strategy import FedAvg
+from flwr.server.strategy.aggregate import aggregate
 import numpy as np
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
-from torchvision import datasets, transforms
+from torchvision import datasets
 
 # Configure structured JSON logging
 logging.basicConfig(
@@ -25,6 +35,36 @@ logging.basicConfig(
 )
 logger = logging.getLogger("fl_server")
 
+# Server events are buffered and written in batches: the buffer is flushed
+# after every round_end and experiment_end (and on errors and at exit), so a
+# round's events reach the log together with a single write
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(logging.Formatter('%(message)s'))
+_log_buffer = logging.handlers.MemoryHandler(
+    capacity=64, flushLevel=logging.ERROR, target=_stream_handler
+)
+logger.addHandler(_log_buffer)
+logger.propagate = False
+atexit.register(_log_buffer.flush)
+
+# Bound encode of a default encoder, shared by every log_event call; the
+# default ", " separators are kept, run_one.py matches on them
+_encode_json = json.JSONEncoder().encode
+
+
+def log_event(event: str, level: int = logging.INFO, **fields):
+    """Log a structured JSON event"""
+    logger.log(level, _encode_json({"event": event, **fields}))
+
+
+# Fixed-size record for the optional binary round log (--round-log): kind
+# (0 = round_start, 1 = round_end), round_id, timestamp, wall_time_since_start,
+# round_duration_sec, test_loss, test_accuracy, num_clients_success,
+# num_clients_failed, flags (1 = evaluated, 2 = eval_cached). Fields a
+# round_start does not have are NaN / 0. Decoded by scripts/decode_round_log.py
+ROUND_RECORD = struct.Struct("<BIdddddiiB")
+ROUND_START, ROUND_END = 0, 1
+
 
 class SimpleCNN(nn.Module):
     """Simple CNN for MNIST"""
@@ -52,59 +92,142 @@ class SimpleCNN(nn.Module):
         return x
 
 
-def load_test_data():
-    """Load MNIST test set for global evaluation"""
-    transform = transforms.Compose([
-        transforms.ToTensor(),
-        transforms.Normalize((0.1307,), (0.3081,))
-    ])
+# Where the MNIST test set is downloaded to
+MNIST_ROOT = "/data/mnist"
+
+
+def from_readonly_numpy(array: np.ndarray) -> torch.Tensor:
+    """
+    torch.from_numpy for a read-only view (of file or received bytes)
+    
+    The result is only ever read (copied or converted), never written
+    through, so torch's non-writable-array warning is silenced for this
+    call alone.
+    """
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="The given NumPy array is not writable")
+        return torch.from_numpy(array)
+
+
+def load_test_data(device: torch.device) -> Tuple[torch.Tensor, torch.Tensor]:
+    """
+    Load MNIST test set for global evaluation, normalized once on the device
     
-    testset = datasets.MNIST(
-        "/data/mnist", 
-        train=False, 
-        download=True, 
-        transform=transform
-    )
+    Returns (images, labels); every round evaluates on these tensors, so
+    there is no per-sample transform, DataLoader or host-to-device copy.
+    """
+    raw_dir = Path(MNIST_ROOT) / "MNIST" / "raw"
+    image_file = raw_dir / "t10k-images-idx3-ubyte"
+    label_file = raw_dir / "t10k-labels-idx1-ubyte"
+    if not (image_file.exists() and label_file.exists()):
+        datasets.MNIST(MNIST_ROOT, train=False, download=True)
     
-    testloader = torch.utils.data.DataLoader(
-        testset, 
-        batch_size=128, 
-        shuffle=False
-    )
+    # Raw idx files: big-endian magic and dimensions, then uint8 payload
+    image_data = image_file.read_bytes()
+    label_data = label_file.read_bytes()
+    num_images = int.from_bytes(image_data[4:8], "big")
+    if int.from_bytes(image_data[0:4], "big") != 2051 or len(image_data) != 16 + num_images * 28 * 28:
+        raise ValueError(f"Not an MNIST idx3 image file: {image_file}")
+    if int.from_bytes(label_data[0:4], "big") != 2049 or len(label_data) != 8 + num_images:
+        raise ValueError(f"Not an MNIST idx1 label file: {label_file}")
+    raw_images = np.frombuffer(image_data, dtype=np.uint8, offset=16).reshape(-1, 1, 28, 28)
+    raw_labels = np.frombuffer(label_data, dtype=np.uint8, offset=8)
     
-    return testloader
+    # Upload the uint8 pixels (a quarter of the float32 bytes) and convert on
+    # the device; .float() yields a fresh tensor, so the read-only view is
+    # never written. ToTensor() + Normalize((0.1307,), (0.3081,)) are then
+    # folded into one scale and one shift, x / (255 * std) - mean / std
+    images = from_readonly_numpy(raw_images).to(device).float()
+    images = images.mul_(1.0 / (255.0 * 0.3081)).sub_(0.1307 / 0.3081)
+    labels = torch.from_numpy(raw_labels.astype(np.int64)).to(device)
+    return images, labels
+
+
+# Test images per evaluation batch; divides the 10k test set evenly, so
+# every batch has the same shape and the compiled eval model replays a
+# single captured CUDA graph (no extra graph or recompile for a tail batch)
+EVAL_BATCH_SIZE = 250
 
 
 def evaluate_global_model(
     model: nn.Module, 
-    testloader: torch.utils.data.DataLoader,
+    test_images: torch.Tensor,
+    test_labels: torch.Tensor,
     device: torch.device
 ) -> Tuple[float, float]:
     """Evaluate model on test set"""
     criterion = nn.CrossEntropyLoss(reduction='sum')
     model.eval()
-    test_loss = 0
-    correct = 0
+    # Accumulate on the device; a single .item() per metric at the end
+    # instead of a GPU sync per batch
+    test_loss = torch.zeros((), device=device)
+    correct = torch.zeros((), device=device, dtype=torch.long)
     
-    with torch.no_grad():
-        for data, target in testloader:
-            data, target = data.to(device), target.to(device)
-            output = model(data)
-            test_loss += criterion(output, target).item()
-            pred = output.argmax(dim=1, keepdim=True)
-            correct += pred.eq(target.view_as(pred)).sum().item()
+    # Inference only, so reduced precision needs no loss scaling; the loss
+    # is still computed and accumulated in FP32
+    if device.type == "cuda":
+        dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+        autocast = torch.autocast(device_type="cuda", dtype=dtype)
+    else:
+        autocast = contextlib.nullcontext()
     
-    test_loss /= len(testloader.dataset)
-    accuracy = 100. * correct / len(testloader.dataset)
+    with torch.no_grad(), autocast:
+        for data, target in zip(test_images.split(EVAL_BATCH_SIZE), test_labels.split(EVAL_BATCH_SIZE)):
+            output = model(data).float()
+            test_loss += criterion(output, target)
+            correct += (output.argmax(dim=1) == target).sum()
+    
+    num_samples = len(test_labels)
+    test_loss = test_loss.item() / num_samples
+    accuracy = 100. * correct.item() / num_samples
     
     return test_loss, accuracy
 
 
+def tensors_to_ndarrays(tensors: List[bytes]) -> List[np.ndarray]:
+    """
+    Zero-copy parameters_to_ndarrays for Flower's .npy-serialized tensors
+    
+    Parses each .npy header and returns a read-only view of the payload
+    instead of going through np.load on a BytesIO copy.
+    """
+    arrays = []
+    for buf in tensors:
+        header = io.BytesIO(buf)
+        major, _ = np.lib.format.read_magic(header)
+        read_header = (np.lib.format.read_array_header_1_0 if major == 1
+                       else np.lib.format.read_array_header_2_0)
+        shape, fortran_order, dtype = read_header(header)
+        array = np.frombuffer(buf, dtype=dtype, count=int(np.prod(shape)), offset=header.tell())
+        arrays.append(array.reshape(shape, order="F" if fortran_order else "C"))
+    return arrays
+
+
+def compile_model(model: nn.Module, device: torch.device) -> nn.Module:
+    """
+    torch.compile the model on CUDA GPUs with compute capability >= 7.0
+    
+    The compiled wrapper shares the model's parameters, so weights loaded
+    into the model in place are used without recompiling; elsewhere the
+    model is returned as is.
+    """
+    if device.type != "cuda" or torch.cuda.get_device_capability(device)[0] < 7:
+        return model
+    return torch.compile(model, mode="reduce-overhead")
+
+
 class LoggingFedAvg(FedAvg):
     """
     FedAvg strategy with comprehensive logging for measurement
     """
-    def __init__(self, *args, **kwargs):
+    def __init__(
+        self,
+        *args,
+        eval_every: int = 1,
+        num_rounds: Optional[int] = None,
+        round_log: Optional[str] = None,
+        **kwargs,
+    ):
         super().__init__(*args, **kwargs)
         self.round_start_time = None
         self.training_start_time = time.time()
@@ -113,11 +236,41 @@ class LoggingFedAvg(FedAvg):
         self.target_accuracies = [95.0, 97.0, 98.0]
         self.tta_reached = {acc: None for acc in self.target_accuracies}
         
+        # Once every target is reached, only every eval_every-th round (and
+        # the final one) is evaluated; the others repeat the last metrics
+        self.eval_every = max(1, eval_every)
+        self.num_rounds = num_rounds
+        self._last_metrics = None
+        # Digest of the parameters _last_metrics were measured on
+        self._last_digest = None
+        
+        # round_start/round_end go to this binary file instead of the JSON
+        # log when set; milestones and experiment events stay JSON
+        self._round_log = open(round_log, "wb") if round_log else None
+        
         # Track model and data for evaluation
         self.model = SimpleCNN()
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         self.model.to(self.device)
-        self.testloader = load_test_data()
+        self.model.eval()
+        # Shares storage with the model's parameters (see _load_parameters)
+        self._state = self.model.state_dict()
+        # On CUDA, aggregated weights are staged in reusable pinned host
+        # buffers so the upload is a true async copy (see _load_parameters)
+        self._host_params = None
+        if self.device.type == "cuda":
+            self._host_params = [torch.empty(t.shape, dtype=t.dtype).pin_memory()
+                                 for t in self._state.values()]
+        # Module that evaluation runs; weights are loaded into self.model
+        self.eval_model = compile_model(self.model, self.device)
+        self.test_images, self.test_labels = load_test_data(self.device)
+        
+        # Rounds are evaluated one at a time, in order, on a dedicated thread
+        # (and CUDA stream), overlapping with the next round's dispatch
+        self._eval_executor = ThreadPoolExecutor(max_workers=1)
+        # Kept so wait_for_evaluations() can surface a crashed evaluation
+        self._eval_futures = []
+        self._eval_stream = torch.cuda.Stream(self.device) if self.device.type == "cuda" else None
     
     def configure_fit(
         self, server_round: int, parameters: Parameters, client_manager
@@ -125,12 +278,20 @@ class LoggingFedAvg(FedAvg):
         """Log round start and configure clients"""
         self.round_start_time = time.time()
         
-        logger.info(json.dumps({
-            "event": "round_start",
-            "round_id": server_round,
-            "timestamp": self.round_start_time,
-            "wall_time_since_start": self.round_start_time - self.training_start_time
-        }))
+        if self._round_log is not None:
+            nan = float("nan")
+            self._round_log.write(ROUND_RECORD.pack(
+                ROUND_START, server_round, self.round_start_time,
+                self.round_start_time - self.training_start_time,
+                nan, nan, nan, 0, 0, 0
+            ))
+        else:
+            log_event(
+                "round_start",
+                round_id=server_round,
+                timestamp=self.round_start_time,
+                wall_time_since_start=self.round_start_time - self.training_start_time,
+            )
         
         return super().configure_fit(server_round, parameters, client_manager)
     
@@ -145,65 +306,246 @@ class LoggingFedAvg(FedAvg):
         round_duration = round_end_time - self.round_start_time
         
         # Perform aggregation
-        aggregated_parameters, aggregated_metrics = super().aggregate_fit(
-            server_round, results, failures
-        )
+        aggregated_parameters, aggregated_metrics = self._aggregate(results, failures)
         
-        # Evaluate global model
-        self.model.load_state_dict(
-            self._parameters_to_state_dict(aggregated_parameters)
-        )
-        test_loss, accuracy = evaluate_global_model(
-            self.model, self.testloader, self.device
+        # Evaluate global model in the background: the aggregated parameters
+        # go back to Flower (and out to the clients) while the GPU evaluates
+        future = self._eval_executor.submit(
+            self._evaluate_round, server_round, aggregated_parameters,
+            round_end_time, round_duration, len(results), len(failures)
         )
+        future.add_done_callback(functools.partial(self._report_eval_crash, server_round))
+        self._eval_futures.append(future)
+        
+        return aggregated_parameters, aggregated_metrics
+    
+    def _aggregate(
+        self,
+        results: List[Tuple[fl.server.client_proxy.ClientProxy, FitRes]],
+        failures: List[BaseException],
+    ):
+        """
+        FedAvg.aggregate_fit, decoding each client's parameters only once
+        
+        Clients send fp16 parameters; they are upcast to FP32 so the weighted
+        sums cannot overflow or lose precision, passed straight to Flower's
+        aggregate(), and only the aggregated result is re-encoded.
+        """
+        if not results or (failures and not self.accept_failures):
+            return None, {}
+        
+        weights_results = [
+            ([a.astype(np.float32) if a.dtype == np.float16 else a
+              for a in tensors_to_ndarrays(fit_res.parameters.tensors)],
+             fit_res.num_examples)
+            for _, fit_res in results
+        ]
+        aggregated_parameters = ndarrays_to_parameters(aggregate(weights_results))
+        
+        aggregated_metrics = {}
+        if self.fit_metrics_aggregation_fn:
+            aggregated_metrics = self.fit_metrics_aggregation_fn(
+                [(fit_res.num_examples, fit_res.metrics) for _, fit_res in results]
+            )
+        return aggregated_parameters, aggregated_metrics
+    
+    def _evaluate_round(
+        self,
+        server_round: int,
+        parameters: Parameters,
+        round_end_time: float,
+        round_duration: float,
+        num_success: int,
+        num_failed: int,
+    ):
+        """Evaluate a round's global model and log its round_end event (runs on the eval thread)"""
+        if parameters is None:
+            # Nothing was aggregated (every client failed); there is no new
+            # global model to evaluate
+            self._log_round_end(
+                server_round, round_end_time, round_duration, num_success, num_failed,
+                None, None, evaluated=False
+            )
+            return
+        
+        all_reached = all(t is not None for t in self.tta_reached.values())
+        if (all_reached and self._last_metrics is not None
+                and server_round % self.eval_every != 0
+                and server_round != self.num_rounds):
+            self._log_round_end(
+                server_round, round_end_time, round_duration, num_success, num_failed,
+                *self._last_metrics, evaluated=False
+            )
+            return
+        
+        try:
+            # Identical parameters give identical metrics: reuse the last ones
+            digest = hashlib.blake2b(digest_size=8)
+            for tensor in parameters.tensors:
+                digest.update(tensor)
+            digest = digest.digest()
+            if digest == self._last_digest:
+                self._log_round_end(
+                    server_round, round_end_time, round_duration, num_success, num_failed,
+                    *self._last_metrics, evaluated=False, eval_cached=True
+                )
+                return
+            
+            if self._eval_stream is not None:
+                # Work queued on the default stream (e.g. the test set upload) comes first
+                self._eval_stream.wait_stream(torch.cuda.default_stream(self.device))
+                stream = torch.cuda.stream(self._eval_stream)
+            else:
+                stream = contextlib.nullcontext()
+            with stream:
+                self._load_parameters(parameters)
+                test_loss, accuracy = evaluate_global_model(
+                    self.eval_model, self.test_images, self.test_labels, self.device
+                )
+        except Exception as e:
+            log_event(
+                "round_eval_failed",
+                round_id=server_round,
+                error=str(e),
+                timestamp=time.time(),
+                level=logging.ERROR,
+            )
+            # The round still gets its round_end, without metrics
+            self._log_round_end(
+                server_round, round_end_time, round_duration, num_success, num_failed,
+                None, None, evaluated=False
+            )
+            return
+        self._last_metrics = (test_loss, accuracy)
+        self._last_digest = digest
         
         # Check TTA milestones
         for target_acc in self.target_accuracies:
             if accuracy >= target_acc and self.tta_reached[target_acc] is None:
                 self.tta_reached[target_acc] = round_end_time - self.training_start_time
-                logger.info(json.dumps({
-                    "event": "target_accuracy_reached",
-                    "target_accuracy": target_acc,
-                    "actual_accuracy": accuracy,
-                    "round_id": server_round,
-                    "time_to_accuracy": self.tta_reached[target_acc],
-                    "timestamp": round_end_time
-                }))
+                log_event(
+                    "target_accuracy_reached",
+                    target_accuracy=target_acc,
+                    actual_accuracy=accuracy,
+                    round_id=server_round,
+                    time_to_accuracy=self.tta_reached[target_acc],
+                    timestamp=round_end_time,
+                )
         
-        # Log round completion
-        logger.info(json.dumps({
-            "event": "round_end",
-            "round_id": server_round,
-            "timestamp": round_end_time,
-            "round_duration_sec": round_duration,
-            "num_clients_success": len(results),
-            "num_clients_failed": len(failures),
-            "test_loss": test_loss,
-            "test_accuracy": accuracy,
-            "wall_time_since_start": round_end_time - self.training_start_time
-        }))
+        self._log_round_end(
+            server_round, round_end_time, round_duration, num_success, num_failed,
+            test_loss, accuracy, evaluated=True
+        )
+    
+    def _log_round_end(
+        self,
+        server_round: int,
+        round_end_time: float,
+        round_duration: float,
+        num_success: int,
+        num_failed: int,
+        test_loss: Optional[float],
+        accuracy: Optional[float],
+        evaluated: bool,
+        eval_cached: bool = False,
+    ):
+        """
+        Log round completion and flush the round's buffered events
         
-        return aggregated_parameters, aggregated_metrics
+        test_loss/accuracy are None when the round could not be evaluated;
+        the fields are then left out (NaN in the binary round log).
+        """
+        if self._round_log is not None:
+            nan = float("nan")
+            self._round_log.write(ROUND_RECORD.pack(
+                ROUND_END, server_round, round_end_time,
+                round_end_time - self.training_start_time, round_duration,
+                nan if test_loss is None else test_loss,
+                nan if accuracy is None else accuracy,
+                num_success, num_failed,
+                int(evaluated) | int(eval_cached) << 1
+            ))
+            _log_buffer.flush()
+            return
+        metrics = {}
+        if test_loss is not None:
+            metrics = {"test_loss": test_loss, "test_accuracy": accuracy}
+        log_event(
+            "round_end",
+            round_id=server_round,
+            timestamp=round_end_time,
+            round_duration_sec=round_duration,
+            num_clients_success=num_success,
+            num_clients_failed=num_failed,
+            **metrics,
+            evaluated=evaluated,
+            eval_cached=eval_cached,
+            wall_time_since_start=round_end_time - self.training_start_time,
+        )
+        _log_buffer.flush()
     
-    def _parameters_to_state_dict(self, parameters: Parameters) -> Dict:
+    def _report_eval_crash(self, server_round: int, future):
+        """Done callback: log an evaluation that raised outside its own error handling"""
+        if future.cancelled() or future.exception() is None:
+            return
+        log_event(
+            "round_eval_crashed",
+            round_id=server_round,
+            error=repr(future.exception()),
+            timestamp=time.time(),
+            level=logging.ERROR,
+        )
+    
+    def wait_for_evaluations(self):
         """
-        Convert Flower parameters to PyTorch state dict
+        Block until every submitted round evaluation has been logged
         
-        FIX: Use flwr.common.parameters_to_ndarrays() - Parameters.tensors are BYTES, not ndarrays
-        See: https://flower.ai/docs/framework/ref-api/flwr.common.html#flwr.common.Parameters
+        Re-raises the first exception a round's evaluation crashed with, so
+        a broken evaluation fails the run instead of vanishing on the thread.
         """
-        from flwr.common import parameters_to_ndarrays
+        self._eval_executor.shutdown(wait=True)
+        if self._round_log is not None:
+            self._round_log.close()
+        for future in self._eval_futures:
+            if future.exception() is not None:
+                raise future.exception()
+    
+    def _load_parameters(self, parameters: Parameters):
+        """
+        Copy Flower parameters into the model's weights in place
         
-        # Convert Parameters to list of numpy arrays (handles bytes->ndarray conversion)
-        params_arrays = parameters_to_ndarrays(parameters)
-        params_dict = {}
+        FIX: Parameters.tensors are BYTES (.npy format), not ndarrays - see tensors_to_ndarrays()
+        See: https://flower.ai/docs/framework/ref-api/flwr.common.html#flwr.common.Parameters
         
-        # Map parameter arrays to model layers
-        state_dict_keys = list(self.model.state_dict().keys())
-        for key, param_array in zip(state_dict_keys, params_arrays):
-            params_dict[key] = torch.from_numpy(param_array)
+        The cached state_dict tensors share storage with the model, so each
+        array is copied straight into existing device memory: no per-round
+        state dict, tensor allocation or load_state_dict. Swapping storages
+        instead (load_state_dict(..., assign=True)) would detach the weights
+        that the compiled eval_model and its captured graphs point at.
+        On CUDA the arrays go through pinned staging buffers, so each upload
+        is queued asynchronously on the evaluation stream.
+        """
+        # Views of the .npy payloads in parameters.tensors, no per-array copy
+        params_arrays = tensors_to_ndarrays(parameters.tensors)
+        if len(params_arrays) != len(self._state):
+            raise ValueError(f"Expected {len(self._state)} parameter arrays, got {len(params_arrays)}")
         
-        return params_dict
+        # Map parameter arrays to model layers
+        host_params = self._host_params or [None] * len(self._state)
+        with torch.no_grad():
+            for (name, param), param_array, staging in zip(self._state.items(), params_arrays, host_params):
+                # copy_ would silently broadcast a mismatched array
+                if param_array.shape != param.shape:
+                    raise ValueError(
+                        f"Shape mismatch for {name}: expected {tuple(param.shape)}, got {param_array.shape}"
+                    )
+                if staging is None:
+                    param.copy_(from_readonly_numpy(param_array))
+                else:
+                    # Each buffer is rewritten only after the previous round's
+                    # evaluation has synchronized on its .item() calls
+                    np.copyto(staging.numpy(), param_array, casting="same_kind")
+                    param.copy_(staging, non_blocking=True)
 
 
 def main():
@@ -217,20 +559,26 @@ def main():
     parser.add_argument("--fraction-fit", type=float, default=1.0)
     parser.add_argument("--fraction-evaluate", type=float, default=0.0)
     parser.add_argument("--server-address", type=str, default="0.0.0.0:8080")
+    parser.add_argument("--eval-every", type=int, default=1,
+                        help="Evaluate every N-th round once all TTA targets are reached "
+                             "(other rounds log round_end with evaluated=false)")
+    parser.add_argument("--round-log", type=str, default=None,
+                        help="Write round_start/round_end as binary records to this file instead of JSON")
     args = parser.parse_args()
     
     # Log experiment start
-    logger.info(json.dumps({
-        "event": "experiment_start",
-        "timestamp": time.time(),
-        "config": {
+    log_event(
+        "experiment_start",
+        timestamp=time.time(),
+        config={
             "num_rounds": args.num_rounds,
             "min_clients": args.min_clients,
             "fraction_fit": args.fraction_fit,
             "server_address": args.server_address,
+            "eval_every": args.eval_every,
             "run_id": os.getenv("RUN_ID", "unknown")
-        }
-    }))
+        },
+    )
     
     # Create strategy
     strategy = LoggingFedAvg(
@@ -238,6 +586,9 @@ def main():
         min_fit_clients=args.min_clients,  # Ensure all clients participate
         fraction_fit=args.fraction_fit,
         fraction_evaluate=args.fraction_evaluate,
+        eval_every=args.eval_every,
+        num_rounds=args.num_rounds,
+        round_log=args.round_log,
     )
     
     # Start server
@@ -247,12 +598,16 @@ def main():
         strategy=strategy,
     )
     
+    # Every round's round_end must be logged before experiment_end
+    strategy.wait_for_evaluations()
+    
     # Log experiment end
-    logger.info(json.dumps({
-        "event": "experiment_end",
-        "timestamp": time.time(),
-        "tta_results": strategy.tta_reached
-    }))
+    log_event(
+        "experiment_end",
+        timestamp=time.time(),
+        tta_results=strategy.tta_reached,
+    )
+    _log_buffer.flush()
 
 
 if __name__ == "__main__":